@@ -1,16 +1,23 @@
 """ColorExtractor - Tkinter app to extract color palettes from an image."""
 import os
+import sys
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, colorchooser
 from tkinter import HORIZONTAL, DISABLED, NORMAL, LEFT, RIGHT, END
 from PIL import Image, ImageTk, ImageDraw, ImageFont
-from src.palette import Palette, rgb_to_hex, hex_to_rgb, relative_luminance
+from src.palette import Palette, rgb_to_hex, hex_to_rgb, first_pixel_per_color, stride_sample_image, stride_step, working_image
 import io
 import math
 import json
+import re
 import numpy as np
 import time
+import zlib
+import atexit
+import threading
+from collections import deque
+from concurrent.futures import Future
 
 MAX_WARN = 50
 MAX_ERROR = 75
@@ -27,11 +34,46 @@ DEFAULT_SETTINGS = {
 }
 SETTINGS_FILE = Path.home() / '.colorextractor_settings.json'
 
+
+def _build_icon_rgba():
+    """32x32 two-tone circle icon as an RGBA array, built with vectorized masks."""
+    yy, xx = np.ogrid[:32, :32]
+    r2 = (xx - 15.5) ** 2 + (yy - 15.5) ** 2
+    arr = np.zeros((32, 32, 4), dtype=np.uint8)
+    arr[r2 <= 14 ** 2] = (34, 139, 34, 255)
+    arr[r2 <= 8 ** 2] = (173, 255, 47, 255)
+    return arr
+
+
+_ICON_RGBA = _build_icon_rgba()
+# the cached .ico is named after a checksum of the icon pixels, so changing the icon refreshes it
+ICON_CACHE_PATH = Path.home() / f'.colorextractor_icon_{zlib.crc32(_ICON_RGBA.tobytes()):08x}.ico'
+
 # Debug controls (off by default; enable via env vars)
 DEBUG_ENABLED = os.getenv('COLOREXTRACTOR_DEBUG') == '1'
 DEBUG_RESET = os.getenv('COLOREXTRACTOR_DEBUG_RESET') == '1'
 DEBUG_LOG_PATH = Path.home() / '.colorextractor_debug.log'
 
+# Resolve the platform-specific mousewheel delta handling once at import
+_IS_DARWIN = sys.platform == 'darwin'
+
+
+def _wheel_darwin(canvas, event):
+    # macOS reports raw delta values
+    canvas.yview_scroll(int(-1 * event.delta), 'units')
+
+
+def _wheel_other(canvas, event):
+    # Windows multiples are usually +/-120
+    canvas.yview_scroll(int(-1 * (event.delta // 120)), 'units')
+
+
+# Bindtag shared by the palette canvas and its tiles for scoped mousewheel handling
+PALETTE_WHEEL_TAG = 'PaletteWheel'
+
+# Tk geometry strings look like 'WxH+X+Y' (offsets may be negative, e.g. '+-4')
+_GEOMETRY_RE = re.compile(r'(\d+)x(\d+)\+(-?\d+)\+(-?\d+)')
+
 # Enable a focused button-layout debug mode when explicitly requested.
 BUTTON_LAYOUT_DEBUG = os.getenv('COLOREXTRACTOR_BUTTON_DEBUG') == '1'
 
@@ -42,14 +84,39 @@ if DEBUG_RESET:
     except Exception:
         pass
 
-def _debug_log(message: str):
-    if not DEBUG_ENABLED:
-        return
-    try:
+if DEBUG_ENABLED:
+    # buffer log lines in memory and let a daemon thread append them to disk in batches,
+    # instead of an open/write/close per message
+    _LOG_BUF = deque(maxlen=4096)
+
+    def _debug_log(message: str):
         ts = time.strftime('%Y-%m-%d %H:%M:%S')
-        with open(DEBUG_LOG_PATH, 'a', encoding='utf-8') as f:
-            f.write(f'[{ts}] {message}\n')
-    except Exception:
+        _LOG_BUF.append(f'[{ts}] {message}\n')
+
+    def _flush_debug_log():
+        lines = []
+        try:
+            while True:
+                lines.append(_LOG_BUF.popleft())
+        except IndexError:
+            pass
+        if not lines:
+            return
+        try:
+            with open(DEBUG_LOG_PATH, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+        except Exception:
+            pass
+
+    def _debug_log_writer():
+        while True:
+            time.sleep(0.5)
+            _flush_debug_log()
+
+    threading.Thread(target=_debug_log_writer, name='colorextractor-debug-log', daemon=True).start()
+    atexit.register(_flush_debug_log)
+else:
+    def _debug_log(message: str):
         pass
 
 class ColorExtractor(tk.Tk):
@@ -62,55 +129,40 @@ class ColorExtractor(tk.Tk):
             self.minsize(1, 1)
         except Exception:
             pass
-        # runtime-configurable thresholds (defaults mirrored from module-level constants)
-        self.max_warn = MAX_WARN
-        self.max_error = MAX_ERROR
+        # runtime-configurable thresholds (defaults mirrored from module-level constants);
+        # parsed once into memory and flushed to SETTINGS_FILE only when something changes
+        self._settings = dict(DEFAULT_SETTINGS)
+        self._settings_dirty = False
+        self._settings_flush_id = None
         # palette instance (needed for settings to apply)
         self.palette = Palette()
         # Keep palette scrollbar usable by enforcing a minimum thumb fraction (e.g. 8% of track)
         # This prevents the thumb from becoming too small to grab when there are many colors.
         self._min_scroll_frac = 0.08
+        self._wheel_handler = _wheel_darwin if _IS_DARWIN else _wheel_other
+        # last embedded palette width and pending re-render id (see _on_palette_canvas_configure)
+        self._last_palette_width = -1
+        self._palette_rerender_after = None
+        self._pane_dirty = False  # set by configure/motion events, cleared by the idle enforcement
         # Load persisted settings if present (non-fatal)
         try:
             self.load_settings()
         except Exception:
             pass
-        # create a small runtime icon and apply it (generate a temporary .ico placeholder and delete it)
+        # apply the precomputed runtime icon (and a cached .ico for platforms like Windows that prefer one)
         try:
-            # draw a 32x32 base icon (Windows prefers small icons)
-            ico = Image.new('RGBA', (32, 32), (0, 0, 0, 0))
-            draw = ImageDraw.Draw(ico)
-            # draw a simple two-tone circle icon
-            draw.ellipse((2, 2, 29, 29), fill=(34, 139, 34, 255))
-            draw.ellipse((8, 8, 23, 23), fill=(173, 255, 47, 255))
-            # keep the PIL icon and an in-memory PhotoImage
-            self._icon_pil = ico.copy()
+            self._icon_pil = Image.fromarray(_ICON_RGBA)
             self._icon_photo = ImageTk.PhotoImage(self._icon_pil)
             try:
                 # set the window icon from the in-memory image (works cross-platform in many cases)
                 self.iconphoto(False, self._icon_photo)
             except Exception:
                 pass
-            # create a temporary .ico for platforms (like Windows) that prefer an .ico file
             try:
-                import tempfile
-                tmp = tempfile.NamedTemporaryFile(delete=False, suffix='.ico')
-                tmp_path = tmp.name
-                tmp.close()
-                # save multiple sizes into the .ico for better scaling (up to 32x32)
-                ico.save(tmp_path, format='ICO', sizes=[(16,16),(32,32)])
-                try:
-                    self.iconbitmap(tmp_path)
-                except Exception:
-                    pass
-                # keep the temporary file until program exit so platform can use it reliably,
-                # and register cleanup on exit
-                try:
-                    import atexit
-                    self._tmp_icon_path = tmp_path
-                    atexit.register(lambda p=tmp_path: os.remove(p) if os.path.exists(p) else None)
-                except Exception:
-                    pass
+                # encode the multi-size .ico only once; later startups reuse the cached file
+                if not ICON_CACHE_PATH.exists():
+                    self._write_icon_cache()
+                self.iconbitmap(str(ICON_CACHE_PATH))
             except Exception:
                 pass
         except Exception:
@@ -118,15 +170,44 @@ class ColorExtractor(tk.Tk):
         # initialize runtime attributes before building the UI so callbacks and bindings
         # triggered during widget layout see consistent state
         self.img = None
+        self.img_mode = None
+        self._marker_sample = None  # (max_dim, step, sample_w, opaque_idx, pixels) for _pick_markers
+        # 'max' palettes are counted on a daemon worker thread (so closing the window never waits
+        # for it); _max_job is the in-flight (future, image, stats) triple polled from the Tk loop
+        self._max_job = None
         self.tk_img = None
+        self._canvas_item = None  # persistent canvas image item showing tk_img
+        self._marker_ids = []  # pooled marker oval items, reused across redraws
+        self._tile_pool = []  # pooled palette tile canvas items: (rect, hex_text, count_text)
+        self._tile_item_slot = {}  # canvas item id -> tile slot, for click handlers
+        self._tile_state = []  # per tile: last rendered ((bg, hex, count), (row, col)) or None if hidden
+        # redraw debouncing: pending after() ids, last rendered (w, h, fast) key and a
+        # half-resolution copy of the image used for cheap previews while resizing
+        self._redraw_after = None
+        self._redraw_idle_after = None
+        self._last_redraw_size = None
+        self._resize_active = False
+        self._img_preview = None
         self.markers = []  # positions of sample pixels per color
         self.settings_win = None
-        # debug: track last log times to avoid spamming the console
-        self._button_debug_last_log = {}
-        # track original button styles for debug flashing
-        self._button_orig_style = {}
+        # debug: call counters used to throttle logging without reading the clock
+        self._button_debug_tick = 0
+        self._button_debug_last_log = {}  # button name -> tick of its last truncation report
+        self._pane_debug_tick = 0
+        self._btn_measure_cache = {}  # button name -> (text, font name, req_w, req_h) from the last check
         self._button_debug_pending = None
+        # memoized Tk font objects (by widget and by font/style), text widths (by font name, text)
+        # and line heights (by font name)
+        self._font_cache = {}
+        self._widget_font_cache = {}
+        self._measure_cache = {}
+        self._linespace_cache = {}
         self._build_ui()
+        self.protocol('WM_DELETE_WINDOW', self._close_window)
+        # tracked buttons plus a one-time snapshot of their ttk styles (keyed by widget path) so
+        # font resolution and debug checks don't issue repeated cget round-trips
+        self._buttons = {name: getattr(self, name) for name in ('open_btn', 'generate_btn', 'export_text', 'export_img', 'add_btn', 'rem_btn', 'settings_btn')}
+        self._button_styles = {str(btn): btn.cget('style') for btn in self._buttons.values()}
 
         try:
             self.deiconify()
@@ -172,7 +253,6 @@ class ColorExtractor(tk.Tk):
         open_btn = ttk.Button(left_group, text='Open Image', command=self.open_image, width=12)
         open_btn.pack(side=LEFT, padx=4, ipady=4)
         self.open_btn = open_btn
-        self._button_orig_style['open_btn'] = open_btn.cget('style')
 
         ttk.Label(left_group, text='Colors:').pack(side=LEFT, padx=(8,4))
         self.count_var = tk.StringVar(value='8')
@@ -181,7 +261,6 @@ class ColorExtractor(tk.Tk):
 
         self.generate_btn = ttk.Button(left_group, text='Generate', command=self.generate_palette, state=DISABLED, width=12)
         self.generate_btn.pack(side=LEFT, padx=8, ipady=4)
-        self._button_orig_style['generate_btn'] = self.generate_btn.cget('style')
 
         ttk.Label(left_group, text='Sort:').pack(side=LEFT, padx=(12,4))
         self.sort_var = tk.StringVar(value='frequency')
@@ -199,36 +278,8 @@ class ColorExtractor(tk.Tk):
         export_img.pack(side=RIGHT, padx=4, ipady=4)
         self.export_text = export_text
         self.export_img = export_img
-        self._button_orig_style['export_text'] = export_text.cget('style')
-        self._button_orig_style['export_img'] = export_img.cget('style')
 
-        # lock the left/right group widths to their requested sizes to avoid button shrinking
-        try:
-            self.update_idletasks()
-            lgw = left_group.winfo_reqwidth()
-            rgw = right_group.winfo_reqwidth()
-            left_group.configure(width=lgw)
-            right_group.configure(width=rgw)
-            # compute reasonable heights to avoid collapsing children to 1px
-            try:
-                self.update_idletasks()
-                left_h = max(open_btn.winfo_reqheight(), self.generate_btn.winfo_reqheight(), self.count_entry.winfo_reqheight(), self.sort_combo.winfo_reqheight(), self.disabled_check.winfo_reqheight()) + 8
-                right_h = max(export_text.winfo_reqheight(), export_img.winfo_reqheight()) + 8
-                left_group.configure(height=left_h)
-                right_group.configure(height=right_h)
-            except Exception:
-                pass
-            left_group.pack_propagate(True)
-            right_group.pack_propagate(True)
-            # Do not enforce a window minsize so the user can resize freely. Log a suggestion for debugging.
-            try:
-                top_req = top.winfo_reqwidth()
-                min_w = max(top_req + 16, 400)
-                min_h = max(self.winfo_reqheight(), 400)
-            except Exception:
-                pass
-        except Exception:
-            pass
+        # group widths/heights are locked once by _deferred_lock after the window is first mapped
 
         main = ttk.Panedwindow(self, orient='horizontal')
         # reduced padding so the main pane takes more vertical space
@@ -245,10 +296,10 @@ class ColorExtractor(tk.Tk):
             except Exception:
                 pass
             # Use press/release + global motion binding to reliably detect sash dragging across platforms
-            main.bind('<ButtonPress-1>', lambda e: self._on_pane_press(e, self.main_paned))
-            main.bind('<ButtonRelease-1>', lambda e: self._on_pane_release(e, self.main_paned))
-            # periodic enforcement as a fallback for platforms that bypass motion events
-            self.after(150, self._periodic_pane_enforce)
+            main.bind('<ButtonPress-1>', self._on_pane_press)
+            main.bind('<ButtonRelease-1>', self._on_pane_release)
+            # re-check pane minima whenever the paned window itself is resized (event-driven, no polling)
+            main.bind('<Configure>', self._mark_pane_dirty)
         except Exception:
             pass
 
@@ -257,7 +308,7 @@ class ColorExtractor(tk.Tk):
         main.add(left, weight=3)
         self.canvas = tk.Canvas(left, background='#222', highlightthickness=0)
         self.canvas.pack(fill='both', expand=True)
-        self.canvas.bind('<Configure>', lambda e: self._redraw_image())
+        self.canvas.bind('<Configure>', self._schedule_redraw)
 
         # Right: palette list
         right = ttk.Frame(main)
@@ -280,94 +331,59 @@ class ColorExtractor(tk.Tk):
         rem_btn.pack(side=LEFT, padx=4, ipady=4)
         self.add_btn = add_btn
         self.rem_btn = rem_btn
-        self._button_orig_style['add_btn'] = add_btn.cget('style')
-        self._button_orig_style['rem_btn'] = rem_btn.cget('style')
         try:
-            # compute required width and lock the control frame so buttons don't get truncated
-            self.update_idletasks()
-            ctrl_req = add_btn.winfo_reqwidth() + rem_btn.winfo_reqwidth() + 12
-            ctrl.configure(width=ctrl_req)
-            ctrl.pack_propagate(True)
-
-            # schedule a deferred lock that will run after the window is mapped and theme/fonts settle
+            # deferred lock that runs once after the window is mapped and theme/fonts settle; it
+            # performs the single layout flush and locks the toolbar/control group sizes so
+            # buttons don't get truncated
             def _deferred_lock():
                 try:
-                    import tkinter.font as tkfont
-                    import time
                     self.update_idletasks()
-                    # measure left group using font metrics for precision
+                    # measure left group using (memoized) font metrics for precision
                     try:
-                        try:
-                            f_open = self._resolve_widget_font(open_btn)
-                            f_generate = self._resolve_widget_font(self.generate_btn)
-                            open_w = f_open.measure(open_btn['text']) + 40  # larger safety padding
-                            gen_w = f_generate.measure(self.generate_btn['text']) + 40
-                        except Exception as e:
-                            open_w = open_btn.winfo_reqwidth()
-                            gen_w = self.generate_btn.winfo_reqwidth()
-                        # include other left-group items spacing
-                        other_left = 220  # increased reserve for entries/combo/check
-                        lgw_px = open_w + gen_w + other_left
-                        left_group.configure(width=lgw_px)
-                        try:
-                            left_h = max(open_btn.winfo_reqheight(), self.generate_btn.winfo_reqheight(), self.count_entry.winfo_reqheight(), self.sort_combo.winfo_reqheight(), self.disabled_check.winfo_reqheight()) + 8
-                            left_group.configure(height=left_h)
-                        except Exception:
-                            pass
-                        left_group.pack_propagate(True)
-                    except Exception as e:
-                        lgw = left_group.winfo_reqwidth()
-                        left_group.configure(width=lgw)
-                        left_group.pack_propagate(True)
+                        open_w = self._measure_text(self._resolve_widget_font(open_btn), open_btn['text']) + 40  # larger safety padding
+                        gen_w = self._measure_text(self._resolve_widget_font(self.generate_btn), self.generate_btn['text']) + 40
+                    except Exception:
+                        open_w = open_btn.winfo_reqwidth()
+                        gen_w = self.generate_btn.winfo_reqwidth()
+                    # include other left-group items spacing
+                    other_left = 220  # increased reserve for entries/combo/check
+                    left_group.configure(width=open_w + gen_w + other_left)
+                    try:
+                        left_h = max(open_btn.winfo_reqheight(), self.generate_btn.winfo_reqheight(), self.count_entry.winfo_reqheight(), self.sort_combo.winfo_reqheight(), self.disabled_check.winfo_reqheight()) + 8
+                        left_group.configure(height=left_h)
+                    except Exception:
+                        pass
+                    left_group.pack_propagate(True)
 
                     # measure right group (export buttons)
                     try:
-                        try:
-                            f_export = self._resolve_widget_font(export_text)
-                            exp1 = f_export.measure(export_text['text']) + 36
-                            f_export2 = self._resolve_widget_font(export_img)
-                            exp2 = f_export2.measure(export_img['text']) + 36
-                            rgw_px = exp1 + exp2 + 20
-                        except Exception as e:
-                            rgw_px = export_text.winfo_reqwidth() + export_img.winfo_reqwidth() + 20
-                        right_group.configure(width=rgw_px)
-                        try:
-                            right_h = max(export_text.winfo_reqheight(), export_img.winfo_reqheight()) + 8
-                            right_group.configure(height=right_h)
-                        except Exception:
-                            pass
-                        right_group.pack_propagate(True)
-                    except Exception as e:
-                        rgw = right_group.winfo_reqwidth()
-                        right_group.configure(width=rgw)
-                        right_group.pack_propagate(True)
+                        exp1 = self._measure_text(self._resolve_widget_font(export_text), export_text['text']) + 36
+                        exp2 = self._measure_text(self._resolve_widget_font(export_img), export_img['text']) + 36
+                        rgw_px = exp1 + exp2 + 20
+                    except Exception:
+                        rgw_px = export_text.winfo_reqwidth() + export_img.winfo_reqwidth() + 20
+                    right_group.configure(width=rgw_px)
+                    try:
+                        right_h = max(export_text.winfo_reqheight(), export_img.winfo_reqheight()) + 8
+                        right_group.configure(height=right_h)
+                    except Exception:
+                        pass
+                    right_group.pack_propagate(True)
 
                     # recompute ctrl width using font metrics
                     try:
-                        try:
-                            f_add = self._resolve_widget_font(add_btn)
-                            f_rem = self._resolve_widget_font(rem_btn)
-                            add_w = f_add.measure(add_btn['text']) + 36
-                            rem_w = f_rem.measure(rem_btn['text']) + 36
-                            creq = add_w + rem_w + 16
-                        except Exception as e:
-                            creq = add_btn.winfo_reqwidth() + rem_btn.winfo_reqwidth() + 12
-                        ctrl.configure(width=creq)
-                        try:
-                            ctrl_h = max(add_btn.winfo_reqheight(), rem_btn.winfo_reqheight()) + 8
-                            ctrl.configure(height=ctrl_h)
-                        except Exception:
-                            pass
-                        ctrl.pack_propagate(True)
-                    except Exception as e:
+                        add_w = self._measure_text(self._resolve_widget_font(add_btn), add_btn['text']) + 36
+                        rem_w = self._measure_text(self._resolve_widget_font(rem_btn), rem_btn['text']) + 36
+                        creq = add_w + rem_w + 16
+                    except Exception:
                         creq = add_btn.winfo_reqwidth() + rem_btn.winfo_reqwidth() + 12
-                        ctrl.configure(width=creq)
-                        try:
-                            ctrl_h = max(add_btn.winfo_reqheight(), rem_btn.winfo_reqheight()) + 8
-                            ctrl.configure(height=ctrl_h)
-                        except Exception:
-                            pass
-                        ctrl.pack_propagate(True)
+                    ctrl.configure(width=creq)
+                    try:
+                        ctrl_h = max(add_btn.winfo_reqheight(), rem_btn.winfo_reqheight()) + 8
+                        ctrl.configure(height=ctrl_h)
+                    except Exception:
+                        pass
+                    ctrl.pack_propagate(True)
 
                     # ensure main window minimum width accommodates the control group and toolbar
                     top_req = top.winfo_reqwidth()
@@ -384,12 +400,7 @@ class ColorExtractor(tk.Tk):
                                 main.paneconfigure(right, minsize=right_min)
                                 self._right_pane_minsize = right_min
                                 if BUTTON_LAYOUT_DEBUG:
-                                    import time
-                                    now = time.time()
-                                    last = getattr(self, '_pane_debug_last', 0)
-                                    if now - last > 0.5:
-                                        _debug_log(f"[PANE_DEBUG] applied right pane minsize: {right_min} total_w={self.winfo_width()}")
-                                        self._pane_debug_last = now
+                                    _debug_log(f"[PANE_DEBUG] applied right pane minsize: {right_min} total_w={self.winfo_width()}")
                             except Exception:
                                 pass
                     except Exception:
@@ -398,23 +409,24 @@ class ColorExtractor(tk.Tk):
                     # Apply a one-time guarded main-window minsize to avoid trivial truncation while preserving resizability.
                     try:
                         if not getattr(self, '_single_minsize_applied', False):
-                            try:
-                                self.minsize(min_w, min_h)
-                                self._single_minsize_applied = True
-                            except Exception:
-                                # ignore failures
-                                pass
-                        else:
-                            pass
+                            self.minsize(min_w, min_h)
+                            self._single_minsize_applied = True
                     except Exception:
                         pass
-                    
                 except Exception:
                     pass
-            # run shortly and again after a bit to catch late layout changes
-            self.after(50, _deferred_lock)
-            self.after(500, _deferred_lock)
-            self.after(2000, _deferred_lock)
+
+            # run a single pass once the main window is first mapped (root bindings also see
+            # child <Map> events, so filter on the toplevel itself)
+            def _on_first_map(event):
+                if event.widget is not self:
+                    return
+                try:
+                    self.unbind('<Map>', self._deferred_lock_bind_id)
+                except Exception:
+                    pass
+                self.after_idle(_deferred_lock)
+            self._deferred_lock_bind_id = self.bind('<Map>', _on_first_map, add='+')
         except Exception:
             pass
 
@@ -423,10 +435,12 @@ class ColorExtractor(tk.Tk):
         # scrollable region
         self.canvas_palette = tk.Canvas(self.palette_frame, borderwidth=0, highlightthickness=0)
         self.scrollbar = ttk.Scrollbar(self.palette_frame, orient='vertical', command=self._on_scrollbar)
-        self.scrollable = ttk.Frame(self.canvas_palette)
-        self.scrollable.bind("<Configure>", lambda e: self.canvas_palette.configure(scrollregion=self.canvas_palette.bbox("all")))
-        # create window and keep a reference so we can resize it when the canvas changes
-        self._palette_window = self.canvas_palette.create_window((0,0), window=self.scrollable, anchor='nw')
+        # tiles are drawn straight onto the canvas as items; one shared binding per item kind
+        self.canvas_palette.tag_bind('tile_block', '<Button-1>', self._on_tile_click)
+        self.canvas_palette.tag_bind('tile_block', '<Double-Button-1>', self._on_tile_double_click)
+        self.canvas_palette.tag_bind('tile_hex', '<Button-1>', self._on_tile_hex_click)
+        self.canvas_palette.tag_bind('tile_hex', '<Enter>', lambda e: self.canvas_palette.configure(cursor='hand2'))
+        self.canvas_palette.tag_bind('tile_hex', '<Leave>', lambda e: self.canvas_palette.configure(cursor=''))
         # Use a custom yscroll handler to support a minimum thumb size for usability
         self.canvas_palette.configure(yscrollcommand=self._on_canvas_scroll)
         # Layout using grid so the scrollbar stays visible even when the pane is very narrow
@@ -452,16 +466,15 @@ class ColorExtractor(tk.Tk):
             except Exception:
                 pass
 
-        # Keep the embedded window sized to the canvas so content doesn't overflow horizontally
+        # Re-flow tile columns when the canvas width changes
         self.canvas_palette.bind('<Configure>', self._on_palette_canvas_configure)
 
-        # Enable mousewheel scrolling when pointer is over the palette area (supports Windows/macOS/Linux)
-        self.scrollable.bind('<Enter>', lambda e: self._bind_palette_mousewheel())
-        self.scrollable.bind('<Leave>', lambda e: self._unbind_palette_mousewheel())
-
-        # Enable mousewheel scrolling when pointer is over the palette area (supports Windows/macOS/Linux)
-        self.scrollable.bind('<Enter>', lambda e: self._bind_palette_mousewheel())
-        self.scrollable.bind('<Leave>', lambda e: self._unbind_palette_mousewheel())
+        # Enable mousewheel scrolling when pointer is over the palette area (supports Windows/macOS/Linux).
+        # Handlers hang off a palette-only bindtag so wheel events elsewhere never reach them.
+        self.bind_class(PALETTE_WHEEL_TAG, '<MouseWheel>', self._on_palette_mousewheel)
+        self.bind_class(PALETTE_WHEEL_TAG, '<Button-4>', self._on_palette_button4)
+        self.bind_class(PALETTE_WHEEL_TAG, '<Button-5>', self._on_palette_button5)
+        self._add_palette_wheel_tag(self.canvas_palette)
 
         # bottom bar with Settings on the left and status text to the right (keeps placement simple and native)
         bottom = ttk.Frame(self)
@@ -469,7 +482,6 @@ class ColorExtractor(tk.Tk):
         settings_btn = ttk.Button(bottom, text='Settings', command=lambda: self.open_settings(), width=10)
         settings_btn.pack(side=LEFT, padx=8, pady=4, ipady=4)
         self.settings_btn = settings_btn
-        self._button_orig_style['settings_btn'] = settings_btn.cget('style')
         self.status = ttk.Label(bottom, text='No image loaded')
         self.status.pack(side=LEFT, padx=8, pady=4, fill='x', expand=True)
         # schedule debug checks on general window configure events (throttled via _schedule_button_debug_check)
@@ -484,21 +496,61 @@ class ColorExtractor(tk.Tk):
         if not p:
             return
         try:
-            im = Image.open(p).convert('RGBA')
+            # only keep an alpha channel when the source can actually be transparent (an alpha
+            # band or a transparency key); opaque formats (JPEG/BMP/...) stay RGB, saving a
+            # quarter of the memory in every scan
+            im = working_image(Image.open(p))
+            im.load()
         except Exception as e:
             messagebox.showerror('Error', f'Unable to open image: {e}')
             _debug_log(f'open_image failed: {e}')
             return
         self.img = im
+        self.img_mode = im.mode
+        self._marker_sample = None
+        self.palette.release_sample()
+        # cache a half-resolution copy so interactive resizes resample far fewer pixels
+        self._img_preview = im.resize((max(1, im.width // 2), max(1, im.height // 2)), Image.BILINEAR)
+        self._last_redraw_size = None
         self.img_path = Path(p)
         self.status.config(text=f'Loaded: {self.img_path.name} ({self.img.width}x{self.img.height})')
-        self.generate_btn.config(state=NORMAL)
+        # a running 'max' count keeps Generate disabled; _poll_max_job re-enables it when done
+        if self._max_job is None:
+            self.generate_btn.config(state=NORMAL)
         _debug_log(f'open_image loaded: {self.img_path} {self.img.width}x{self.img.height}')
         self._redraw_image()
 
+    def _schedule_redraw(self, event=None):
+        """Debounce canvas <Configure> storms.
+
+        Redraws with a cheap bilinear filter shortly after the last event and upgrades to a
+        LANCZOS resample once resizing has been idle for a moment.
+        """
+        if event is not None and self._last_redraw_size and (event.width, event.height) == self._last_redraw_size[:2]:
+            return
+        self._resize_active = True
+        try:
+            if self._redraw_after:
+                self.after_cancel(self._redraw_after)
+            self._redraw_after = self.after(30, self._redraw_image)
+            if self._redraw_idle_after:
+                self.after_cancel(self._redraw_idle_after)
+            self._redraw_idle_after = self.after(120, self._on_resize_idle)
+        except Exception:
+            pass
+
+    def _on_resize_idle(self):
+        self._redraw_idle_after = None
+        self._resize_active = False
+        self._redraw_image()
+
     def _redraw_image(self):
+        self._redraw_after = None
         # defend against early configure events during initialization by checking for the attribute
         if getattr(self, 'img', None) is None:
+            self._last_redraw_size = None
+            self._canvas_item = None
+            self._marker_ids = []
             try:
                 self.canvas.delete('all')
             except Exception:
@@ -506,171 +558,215 @@ class ColorExtractor(tk.Tk):
             return
         w = self.canvas.winfo_width() or 400
         h = self.canvas.winfo_height() or 300
-        # fit image
-        img = self.img.copy()
-        img.thumbnail((w, h), Image.LANCZOS)
-        self.display_scale = img.width / self.img.width
-        self.tk_img = ImageTk.PhotoImage(img)
-        self.canvas.delete('all')
-        self.canvas.create_image(w//2, h//2, image=self.tk_img, anchor='center', tags='img')
+        fast = self._resize_active
+        key = (w, h, fast)
+        # only resample when the canvas size (or requested quality) actually changed
+        if key != self._last_redraw_size or self.tk_img is None:
+            iw, ih = self.img.size
+            scale = min(1.0, w / iw, h / ih)
+            size = (max(1, int(iw * scale)), max(1, int(ih * scale)))
+            if fast:
+                # bilinear from the half-res preview while dragging; full image if upscaling it
+                preview = self._img_preview
+                src = preview if preview is not None and preview.width >= size[0] and preview.height >= size[1] else self.img
+                img = src.resize(size, Image.BILINEAR)
+            else:
+                img = self.img.resize(size, Image.LANCZOS)
+            self.display_scale = img.width / iw
+            if self.tk_img is not None and (self.tk_img.width(), self.tk_img.height()) == img.size:
+                # same rendered size: overwrite the pixels in place instead of allocating a new Tk photo
+                self.tk_img.paste(img)
+            else:
+                self.tk_img = ImageTk.PhotoImage(img)
+            self._last_redraw_size = key
+        # keep a single image item alive and just move/retarget it
+        if self._canvas_item is None:
+            self._canvas_item = self.canvas.create_image(w//2, h//2, image=self.tk_img, anchor='center', tags='img')
+        else:
+            self.canvas.coords(self._canvas_item, w//2, h//2)
+            self.canvas.itemconfig(self._canvas_item, image=self.tk_img)
+        self.canvas.delete('highlight')
         # draw markers
         self._draw_markers()
 
     # --- Button layout debug helpers -------------------------------------------------
     def _resolve_widget_font(self, widget):
+        # per-widget memo in front of the (font, style) keyed resolution below
+        font = self._widget_font_cache.get(str(widget))
+        if font is not None:
+            return font
+        font = self._resolve_widget_font_uncached(widget)
+        self._widget_font_cache[str(widget)] = font
+        return font
+
+    def _resolve_widget_font_uncached(self, widget):
         import tkinter.font as tkfont
-        from tkinter import ttk
-        s = ttk.Style(self)
-        try:
-            val = widget.cget('font')
-        except Exception:
-            val = None
+        val = None
+        if not isinstance(widget, ttk.Widget):
+            # only classic Tk widgets carry a -font option; ttk widgets take it from their style
+            try:
+                val = widget.cget('font')
+            except Exception:
+                pass
+        style = getattr(self, '_button_styles', {}).get(str(widget))
+        if style is None:
+            try:
+                style = widget.cget('style')
+            except Exception:
+                style = None
+        key = (str(val or ''), style or '')
+        cached = self._font_cache.get(key)
+        if cached is not None:
+            return cached
+        font = None
         if val:
             try:
-                return tkfont.Font(font=val)
+                font = tkfont.Font(font=val)
             except Exception:
                 pass
-        try:
-            style = widget.cget('style')
-            if style:
+        if font is None and style:
+            try:
+                fname = ttk.Style(self).lookup(style, 'font')
+                if fname:
+                    font = tkfont.Font(font=fname)
+            except Exception:
+                pass
+        if font is None:
+            for name in ('TkButtonFont', 'TkDefaultFont', 'TkTextFont'):
                 try:
-                    fname = s.lookup(style, 'font')
-                    if fname:
-                        try:
-                            return tkfont.Font(font=fname)
-                        except Exception:
-                            pass
+                    font = tkfont.nametofont(name)
+                    break
                 except Exception:
                     pass
-        except Exception:
-            pass
-        for name in ('TkButtonFont', 'TkDefaultFont', 'TkTextFont'):
+        if font is None:
+            font = tkfont.Font()
+        self._font_cache[key] = font
+        return font
+
+    def _font_linespace(self, font):
+        """Memoized `font.metrics('linespace')` keyed by font name."""
+        key = str(font)
+        lines = self._linespace_cache.get(key)
+        if lines is None:
             try:
-                return tkfont.nametofont(name)
+                lines = font.metrics('linespace')
             except Exception:
-                pass
-        return tkfont.Font()
+                lines = font.metrics('ascent') + font.metrics('descent')
+            self._linespace_cache[key] = lines
+        return lines
+
+    def _measure_text(self, font, text):
+        """Memoized `font.measure(text)` keyed by (font name, text)."""
+        key = (str(font), text)
+        width = self._measure_cache.get(key)
+        if width is None:
+            width = self._measure_cache[key] = font.measure(text)
+        return width
 
     # --- Palette mousewheel helpers -------------------------------------------------
+    # Scroll handlers below fire many times per second, so they use explicit guards rather
+    # than blanket try/except blocks.
     def _on_palette_mousewheel(self, event):
-        try:
-            import sys
-            # macOS reports raw delta values whereas Windows multiples are usually +/-120
-            if sys.platform == 'darwin':
-                delta = int(-1 * event.delta)
-            else:
-                delta = int(-1 * (event.delta // 120))
-            self.canvas_palette.yview_scroll(delta, 'units')
-        except Exception:
-            pass
+        if getattr(self, 'canvas_palette', None) is None:
+            return
+        self._wheel_handler(self.canvas_palette, event)
 
     def _on_palette_button4(self, event):
-        try:
-            self.canvas_palette.yview_scroll(-1, 'units')
-        except Exception:
-            pass
+        if getattr(self, 'canvas_palette', None) is None:
+            return
+        self.canvas_palette.yview_scroll(-1, 'units')
 
     def _on_palette_button5(self, event):
-        try:
-            self.canvas_palette.yview_scroll(1, 'units')
-        except Exception:
-            pass
-
-    def _bind_palette_mousewheel(self):
-        try:
-            self.canvas_palette.bind_all('<MouseWheel>', self._on_palette_mousewheel)
-            self.canvas_palette.bind_all('<Button-4>', self._on_palette_button4)
-            self.canvas_palette.bind_all('<Button-5>', self._on_palette_button5)
-        except Exception:
-            pass
+        if getattr(self, 'canvas_palette', None) is None:
+            return
+        self.canvas_palette.yview_scroll(1, 'units')
 
-    def _unbind_palette_mousewheel(self):
+    def _add_palette_wheel_tag(self, widget):
+        """Route mousewheel events over `widget` to the palette scroll handlers."""
         try:
-            self.canvas_palette.unbind_all('<MouseWheel>')
-            self.canvas_palette.unbind_all('<Button-4>')
-            self.canvas_palette.unbind_all('<Button-5>')
-        except Exception:
+            widget.bindtags((PALETTE_WHEEL_TAG,) + widget.bindtags())
+        except tk.TclError:
             pass
 
     # --- Custom scrollbar behavior -----------------------------------------------
     def _on_scrollbar(self, *args):
         """Intercept scrollbar commands and map them to canvas yview while
         preserving a minimum visual thumb size for usability."""
-        try:
-            if not args:
+        if not args or getattr(self, 'canvas_palette', None) is None:
+            return
+        cmd = args[0]
+        # current real view
+        a, b = self.canvas_palette.yview()
+        real_span = float(b) - float(a)
+        if cmd == 'moveto':
+            frac = float(args[1])
+            # If the real span is large enough, passthrough
+            if real_span >= self._min_scroll_frac:
+                self.canvas_palette.yview_moveto(frac)
                 return
-            cmd = args[0]
-            # current real view
-            a, b = self.canvas_palette.yview()
-            real_span = float(b) - float(a)
-            if cmd == 'moveto':
-                frac = float(args[1])
-                # If the real span is large enough, passthrough
-                if real_span >= self._min_scroll_frac:
-                    self.canvas_palette.yview_moveto(frac)
-                    return
-                # otherwise map visual position to real content position
-                v = max(0.0, min(frac, 1.0 - self._min_scroll_frac))
-                denom = (1.0 - self._min_scroll_frac)
-                if denom == 0 or (1.0 - real_span) == 0:
-                    r = 0.0
-                else:
-                    r = v * (1.0 - real_span) / denom
-                r = max(0.0, min(r, 1.0 - real_span))
-                self.canvas_palette.yview_moveto(r)
-            elif cmd == 'scroll':
-                # scroll N units/pages - pass through to canvas
-                n = int(args[1])
-                what = args[2]
-                self.canvas_palette.yview_scroll(n, what)
-        except Exception:
-            pass
+            # otherwise map visual position to real content position
+            v = max(0.0, min(frac, 1.0 - self._min_scroll_frac))
+            denom = (1.0 - self._min_scroll_frac)
+            if denom == 0 or (1.0 - real_span) == 0:
+                r = 0.0
+            else:
+                r = v * (1.0 - real_span) / denom
+            r = max(0.0, min(r, 1.0 - real_span))
+            self.canvas_palette.yview_moveto(r)
+        elif cmd == 'scroll':
+            # scroll N units/pages - pass through to canvas
+            n = int(args[1])
+            what = args[2]
+            self.canvas_palette.yview_scroll(n, what)
 
     def _on_palette_canvas_configure(self, event):
-        """Ensure the embedded scrollable frame matches the visible canvas width minus
-        the scrollbar thickness and schedule a re-render so tile columns adapt."""
-        try:
-            # compute usable width for the embedded frame
-            try:
-                sbw = self.scrollbar.winfo_width() or 18
-            except Exception:
-                sbw = 18
-            new_w = max(32, event.width - sbw)
-            try:
-                self.canvas_palette.itemconfig(self._palette_window, width=new_w)
-            except Exception:
-                pass
-            # throttle re-render so window resizing doesn't redraw excessively
-            try:
-                if hasattr(self, '_palette_rerender_after') and self._palette_rerender_after:
-                    self.after_cancel(self._palette_rerender_after)
-                self._palette_rerender_after = self.after(100, lambda: self._render_palette_list())
-            except Exception:
-                pass
-        except Exception:
-            pass
+        """Schedule a re-render when the canvas width changes so tile columns adapt."""
+        new_w = max(32, event.width)
+        # height-only changes and restack/jitter events need no re-layout
+        if new_w == self._last_palette_width:
+            return
+        self._last_palette_width = new_w
+        # throttle re-render so window resizing doesn't redraw excessively
+        if self._palette_rerender_after:
+            self.after_cancel(self._palette_rerender_after)
+        self._palette_rerender_after = self.after(50, self._render_palette_list)
 
     def _on_canvas_scroll(self, a, b):
         """Custom yscroll handler to present a minimum visual thumb size when
         the real viewport fraction is very small."""
-        try:
-            a = float(a)
-            b = float(b)
-            real_span = b - a
-            if real_span >= self._min_scroll_frac:
-                # show real span
-                self.scrollbar.set(a, b)
-                return
-            # compute visual top based on linear mapping
-            denom = (1.0 - real_span)
-            if denom == 0:
-                a_vis = 0.0
-            else:
-                a_vis = a * (1.0 - self._min_scroll_frac) / denom
-                a_vis = max(0.0, min(a_vis, 1.0 - self._min_scroll_frac))
-            self.scrollbar.set(a_vis, a_vis + self._min_scroll_frac)
-        except Exception:
-            pass
+        a = float(a)
+        b = float(b)
+        real_span = b - a
+        if real_span >= self._min_scroll_frac:
+            # show real span
+            self.scrollbar.set(a, b)
+            return
+        # compute visual top based on linear mapping
+        denom = (1.0 - real_span)
+        if denom == 0:
+            a_vis = 0.0
+        else:
+            a_vis = a * (1.0 - self._min_scroll_frac) / denom
+            a_vis = max(0.0, min(a_vis, 1.0 - self._min_scroll_frac))
+        self.scrollbar.set(a_vis, a_vis + self._min_scroll_frac)
+
+    def _geom_snapshot(self, widgets, sync: bool = False):
+        """Return {widget: (width, height, x, y)} from one `winfo_geometry` call per widget.
+
+        With `sync` the pending geometry work is flushed once up front via update_idletasks.
+        Widgets that no longer exist are skipped.
+        """
+        if sync:
+            self.update_idletasks()
+        snap = {}
+        for w in widgets:
+            try:
+                m = _GEOMETRY_RE.match(w.winfo_geometry())
+            except tk.TclError:
+                continue
+            if m:
+                snap[w] = tuple(int(v) for v in m.groups())
+        return snap
 
     def _button_layout_debug_check(self):
         """Measure buttons and highlight/log any that are too small for their text (width or height).
@@ -682,42 +778,36 @@ class ColorExtractor(tk.Tk):
             return
         try:
             import tkinter.font as tkfont
-            import time
-            now = time.time()
-            checks = [
-                ('open_btn', getattr(self, 'open_btn', None)),
-                ('generate_btn', getattr(self, 'generate_btn', None)),
-                ('export_text', getattr(self, 'export_text', None)),
-                ('export_img', getattr(self, 'export_img', None)),
-                ('add_btn', getattr(self, 'add_btn', None)),
-                ('rem_btn', getattr(self, 'rem_btn', None)),
-                ('settings_btn', getattr(self, 'settings_btn', None)),
-            ]
-            for name, btn in checks:
+            self._button_debug_tick += 1
+            tick = self._button_debug_tick
+            buttons = getattr(self, '_buttons', {})
+            geom = self._geom_snapshot([b for b in buttons.values() if b is not None])
+            for name, btn in buttons.items():
                 try:
-                    if btn is None or not getattr(btn, 'winfo_exists', lambda: False)():
+                    if btn not in geom:
                         continue
+                    actual_w, actual_h = geom[btn][:2]
                     try:
                         f = self._resolve_widget_font(btn)
                     except Exception:
                         f = tkfont.Font()
-                    # width requirement (existing behavior)
-                    req_w = f.measure(btn['text']) + 18
-                    actual_w = btn.winfo_width()
+                    text = btn['text']
+                    cached = self._btn_measure_cache.get(name)
+                    if cached is not None and cached[0] == text and cached[1] == str(f):
+                        req_w, req_h = cached[2], cached[3]
+                    else:
+                        # width requirement (existing behavior)
+                        req_w = self._measure_text(f, text) + 18
+                        # height requirement (new): use font linespace as baseline + modest padding
+                        req_h = self._font_linespace(f) + 12
+                        self._btn_measure_cache[name] = (text, str(f), req_w, req_h)
                     truncated_w = actual_w < req_w
-                    # height requirement (new): use font linespace as baseline + modest padding
-                    try:
-                        lines = f.metrics('linespace')
-                    except Exception:
-                        lines = f.metrics('ascent') + f.metrics('descent')
-                    req_h = lines + 12
-                    actual_h = btn.winfo_height()
                     truncated_h = actual_h < req_h
 
                     if truncated_w or truncated_h:
-                        last = self._button_debug_last_log.get(name, 0)
-                        if now - last > 1.0:
-                            self._button_debug_last_log[name] = now
+                        last = self._button_debug_last_log.get(name, -16)
+                        if tick - last >= 16:
+                            self._button_debug_last_log[name] = tick
                         # no visual highlights — console-only debug (no style changes or overlays)
                         # Auto-fix: raise owning toplevel minsize (for main window or dialog) when vertical truncation occurs
                         if truncated_h:
@@ -752,11 +842,10 @@ class ColorExtractor(tk.Tk):
         try:
             parent = btn.master if hasattr(btn, 'master') else btn.nametowidget(btn.winfo_parent())
             # compute position relative to parent
-            self.update_idletasks()
-            x = btn.winfo_x()
-            y = btn.winfo_y()
-            w = btn.winfo_width()
-            h = btn.winfo_height()
+            geom = self._geom_snapshot([btn], sync=True).get(btn)
+            if geom is None:
+                return
+            w, h, x, y = geom
             if w <= 0 or h <= 0:
                 return
             overlay = tk.Frame(parent, highlightbackground='red', highlightthickness=2, bd=0)
@@ -772,10 +861,15 @@ class ColorExtractor(tk.Tk):
             pass
 
     def generate_palette(self):
-        if not self.img:
+        if not self.img or self._max_job is not None:
             return
         val = self.count_var.get().strip()
         if val.lower() == 'max':
+            # cheap early rejection: if even a sample has too many colors, skip the estimate
+            if self.palette.sample_exceeds_unique(self.img, self.max_error):
+                messagebox.showerror('Too many colors', 'There are too many colors to display!')
+                _debug_log(f'generate_palette blocked: sample exceeds max_error={self.max_error}')
+                return
             # estimate unique colors from a sampled image to avoid slow full scans
             est_unique, sample_pixels, total_pixels = self.palette.estimate_unique_stats(self.img)
             # extrapolate estimated total unique colors from sample to better trigger thresholds
@@ -792,15 +886,11 @@ class ColorExtractor(tk.Tk):
                 proceed, force = self._ask_full_scan_confirmation(est_total_unique)
                 if not proceed:
                     return
-                try:
-                    self._run_from_image_max(force_full_scan=force)
-                except ValueError as e:
-                    messagebox.showerror('Too many colors', str(e))
-                    _debug_log(f'generate_palette full-scan error: {e}')
-                    return
+                self._run_from_image_max(force_full_scan=force, max_unique_error=self.max_error)
             else:
                 # safe to build from sampled heuristics
-                self.palette.from_image_max(self.img)
+                self._run_from_image_max()
+            return
         else:
             try:
                 n = int(val)
@@ -811,17 +901,65 @@ class ColorExtractor(tk.Tk):
                 return
             # generate via quantization
             self.palette.from_image_quant(self.img, n, max_dim=self.palette.MAX_QUANT_DIM)
-        _debug_log(f'generate_palette done: count={len(self.palette.colors)} mode={val}')
+        self._palette_ready(val)
+
+    def _palette_ready(self, mode: str):
+        # refresh everything that depends on the palette once new colors are in place
+        _debug_log(f'generate_palette done: count={len(self.palette.colors)} mode={mode}')
         self._pick_markers()
         self._render_palette_list()
         self._redraw_image()
 
-    def _run_from_image_max(self, *, force_full_scan: bool = False):
-        # helper to run from_image_max and apply max_unique_error safety cap
+    def _run_from_image_max(self, *, force_full_scan: bool = False, max_unique_error: int = None):
+        # count 'max' colors on the worker thread so the UI (drags, resizes) stays responsive;
+        # the palette itself is only replaced on the Tk thread in _poll_max_job
         # inform user if we're doing an exact scan
         if force_full_scan:
             messagebox.showinfo('Full scan', 'Performing exact full-resolution color scan. This may take a while.')
-        self.palette.from_image_max(self.img, force_full_scan=force_full_scan, max_unique_error=self.max_error)
+        stats = {}
+        future = Future()
+        img = self.img
+
+        def work():
+            try:
+                future.set_result(self.palette.count_image_max(img, force_full_scan=force_full_scan, max_unique_error=max_unique_error, stats_out=stats))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=work, name='palette-max', daemon=True).start()
+        self._max_job = (future, self.img, stats)
+        self.generate_btn.config(state=DISABLED)
+        self.status.config(text='Counting colors...')
+        self.after(50, self._poll_max_job)
+
+    def _poll_max_job(self):
+        future, img, stats = self._max_job
+        if not future.done():
+            self.after(50, self._poll_max_job)
+            return
+        self._max_job = None
+        if self.img is not None:
+            self.generate_btn.config(state=NORMAL)
+        if img is not self.img:
+            # another image was opened while counting; the result no longer applies
+            self.status.config(text=f'Palette: {len(self.palette.colors)} colors')
+            return
+        try:
+            vals, counts = future.result()
+        except ValueError as e:
+            messagebox.showerror('Too many colors', str(e))
+            _debug_log(f'generate_palette full-scan error: {e}')
+            self.status.config(text=f'Palette: {len(self.palette.colors)} colors')
+            return
+        except Exception as e:
+            # e.g. MemoryError on a forced full scan; surface it instead of failing inside after()
+            messagebox.showerror('Error', f'Unable to count colors: {e!r}')
+            _debug_log(f'generate_palette max failed: {e!r}')
+            self.status.config(text=f'Palette: {len(self.palette.colors)} colors')
+            return
+        _debug_log(f'generate_palette max stats: {stats}')
+        self.palette.set_counted_colors(vals, counts)
+        self._palette_ready('max')
 
     def _ask_full_scan_confirmation(self, est_unique: int):
         # modal dialog asking user to confirm large number of colors and optionally force exact counts
@@ -831,22 +969,22 @@ class ColorExtractor(tk.Tk):
         d.grab_set()
         ttk.Label(d, text=f'Estimated unique colors: {est_unique}').pack(padx=12, pady=(12,6))
         ttk.Label(d, text='Too many colors may cause lag. Proceed?').pack(padx=12, pady=(0,6))
-        force_var = tk.BooleanVar(value=False)
+        force_var = tk.BooleanVar(d, value=False)
         chk = ttk.Checkbutton(d, text='Force exact counts (may be slow)', variable=force_var)
         chk.pack(padx=12, pady=(0,12))
         btn_frame = ttk.Frame(d)
         btn_frame.pack(fill='x', pady=6, padx=8)
-        result = {'proceed': False, 'force': False}
+        # Tk variables outlive the dialog, so they carry the answer back after it is destroyed
+        proceed_var = tk.BooleanVar(d, value=False)
         def on_ok():
-            result['proceed'] = True
-            result['force'] = bool(force_var.get())
+            proceed_var.set(True)
             d.destroy()
-        def on_cancel():
-            d.destroy()
-        ttk.Button(btn_frame, text='Cancel', command=on_cancel, width=12).pack(side=LEFT, padx=6, ipady=4)
+        ttk.Button(btn_frame, text='Cancel', command=d.destroy, width=12).pack(side=LEFT, padx=6, ipady=4)
         ttk.Button(btn_frame, text='Proceed', command=on_ok, width=12).pack(side=RIGHT, padx=6, ipady=4)
+        # wait on the window (not the variable) so closing it from the title bar also returns
         self.wait_window(d)
-        return result['proceed'], result['force']
+        proceed = proceed_var.get()
+        return proceed, proceed and force_var.get()
 
     def open_settings(self):
         # Non-modal settings popout to edit thresholds and behavior
@@ -997,18 +1135,20 @@ class ColorExtractor(tk.Tk):
         """
         return
 
-    def _on_pane_press(self, event, paned):
-        """Detect potential sash drag start and begin motion binding."""
+    def _on_pane_press(self, event):
+        """Detect a sash drag start and track motion on the paned widget while button 1 is held."""
+        paned = event.widget
         try:
             try:
+                # ttk::panedwindow reports the index of the sash under (x, y), or '' off-sash
+                on_sash = str(paned.identify(event.x, event.y)) != ''
                 sash = paned.sashpos(0)
             except Exception:
                 return
-            # event.x is relative to the paned widget; allow a small tolerance for clicks around the sash
-            if abs(event.x - sash) <= 16:
+            if on_sash:
                 self._sash_dragging = True
                 try:
-                    paned.bind_all('<Motion>', lambda e: self._enforce_pane_mins(paned))
+                    paned.bind('<B1-Motion>', self._mark_pane_dirty)
                 except Exception:
                     pass
                 if BUTTON_LAYOUT_DEBUG:
@@ -1016,13 +1156,14 @@ class ColorExtractor(tk.Tk):
         except Exception:
             pass
 
-    def _on_pane_release(self, event, paned):
-        """End sash drag; unbind global motion handler and force an enforcement check."""
+    def _on_pane_release(self, event):
+        """End sash drag; drop the drag motion handler and force an enforcement check."""
+        paned = event.widget
         try:
             if getattr(self, '_sash_dragging', False):
                 self._sash_dragging = False
                 try:
-                    paned.unbind_all('<Motion>')
+                    paned.unbind('<B1-Motion>')
                 except Exception:
                     pass
                 # Force an immediate, unthrottled enforcement and verbose debug output
@@ -1044,18 +1185,25 @@ class ColorExtractor(tk.Tk):
         except Exception:
             pass
 
-    def _periodic_pane_enforce(self):
-        """Periodic fallback that enforces pane minima in case motion events are missed."""
+    def _mark_pane_dirty(self, event=None):
+        """Coalesce pane-min enforcement into one idle callback per burst of configure/motion events."""
+        if self._pane_dirty:
+            return
+        self._pane_dirty = True
+        try:
+            self.after_idle(self._maybe_enforce_pane)
+        except Exception:
+            self._pane_dirty = False
+
+    def _maybe_enforce_pane(self):
+        if not self._pane_dirty:
+            return
+        self._pane_dirty = False
         try:
             if getattr(self, 'main_paned', None):
                 self._enforce_pane_mins(self.main_paned)
         except Exception:
             pass
-        finally:
-            try:
-                self.after(150, self._periodic_pane_enforce)
-            except Exception:
-                pass
 
     def _enforce_pane_mins(self, paned, force: bool = False):
         """Clamp sash to keep right-hand pane at or above the computed min width.
@@ -1107,12 +1255,9 @@ class ColorExtractor(tk.Tk):
             right_w = total_w - sash_pos
             # debug: report sash and widths (throttled unless forced)
             if BUTTON_LAYOUT_DEBUG:
-                import time
-                now = time.time()
-                last = getattr(self, '_pane_debug_last', 0)
-                if force or (now - last > 0.3):
+                self._pane_debug_tick += 1
+                if force or (self._pane_debug_tick & 15) == 0:
                     _debug_log(f"[PANE_DEBUG] sash_pos={sash_pos} total_w={total_w} right_w={right_w} min={right_min}")
-                    self._pane_debug_last = now
             if right_w < right_min:
                 new_sash = max(0, total_w - right_min)
                 if BUTTON_LAYOUT_DEBUG:
@@ -1124,56 +1269,50 @@ class ColorExtractor(tk.Tk):
         except Exception:
             pass
 
+    def _marker_sample_for(self, max_dim: int):
+        """Stride-sample the loaded image for marker search: (step, sample_w, opaque_idx, pixels).
+
+        `opaque_idx` holds flat sample indices of the opaque pixels (None for RGB images), so
+        coordinates can be recovered later for just the pixels that are needed.
+        """
+        # nearest-neighbour sample of every `step`-th pixel; the full image is never turned into an array
+        step = stride_step(self.img.size, max_dim)
+        arr = np.asarray(stride_sample_image(self.img, max_dim))
+        flat = arr.reshape(-1, arr.shape[2])
+        if self.img_mode == 'RGBA':
+            opaque = np.flatnonzero(flat[:, 3] > 0)
+            pixels = flat[opaque, :3]
+        else:
+            opaque = None
+            pixels = np.ascontiguousarray(flat[:, :3])
+        return step, arr.shape[1], opaque, pixels
+
     def _pick_markers(self):
         # find at least one pixel coordinate in the original image for each color for highlighting
         # Uses nearest-neighbor mapping on a sampled image to keep performance reasonable.
         self.markers = []
         if not self.img or not self.palette.colors:
             return
-        img = self.img.convert('RGBA')
-        w, h = img.size
+        w, h = self.img.size
         max_dim = 420
-        sample_scale = 1.0
-        if max(w, h) > max_dim:
-            sample_scale = max_dim / max(w, h)
-            sample = img.resize((max(1, int(w * sample_scale)), max(1, int(h * sample_scale))), Image.NEAREST)
-        else:
-            sample = img
-        arr = np.array(sample)
-        mask = arr[:, :, 3] > 0
-        coords = np.argwhere(mask)
-        if coords.size == 0:
+        if self._marker_sample is None or self._marker_sample[0] != max_dim:
+            self._marker_sample = (max_dim,) + self._marker_sample_for(max_dim)
+        _, step, sample_w, opaque, pixels = self._marker_sample
+        if len(pixels) == 0:
             self.markers = [(c['rgb'], None) for c in self.palette.colors]
             return
-        pixels = arr[:, :, :3][mask]
-        k = len(self.palette.colors)
-        pal = np.array([c['rgb'] for c in self.palette.colors], dtype=np.int16)
-        mapping = {i: None for i in range(k)}
-        remaining = set(mapping.keys())
-        chunk = 20000
-        total = pixels.shape[0]
-        for start in range(0, total, chunk):
-            if not remaining:
-                break
-            end = min(start + chunk, total)
-            pix = pixels[start:end].astype(np.int16)
-            diffs = pix[:, None, :] - pal[None, :, :]
-            dists = np.sum(diffs * diffs, axis=2)
-            nearest = np.argmin(dists, axis=1)
-            for i, idx in enumerate(nearest):
-                idx = int(idx)
-                if idx in remaining:
-                    y, x = coords[start + i]
-                    mapping[idx] = (int(x), int(y))
-                    remaining.remove(idx)
-                    if not remaining:
-                        break
+        # first sampled pixel whose nearest palette color is each entry (-1 when none)
+        first = first_pixel_per_color(pixels, self.palette.rgb_array)
+        hit = np.flatnonzero(first >= 0)
+        flat_idx = first[hit] if opaque is None else opaque[first[hit]]
+        ys, xs = np.divmod(flat_idx, sample_w)
+        mapping = dict(zip(hit.tolist(), zip(xs.tolist(), ys.tolist())))
         self.markers = []
         for i, c in enumerate(self.palette.colors):
             pos = mapping.get(i)
             if pos:
-                orig_x = int(pos[0] / sample_scale)
-                orig_y = int(pos[1] / sample_scale)
+                orig_x = pos[0] * step
+                orig_y = pos[1] * step
                 orig_x = max(0, min(orig_x, w - 1))
                 orig_y = max(0, min(orig_y, h - 1))
                 disp_x = int(orig_x * self.display_scale)
@@ -1183,73 +1322,144 @@ class ColorExtractor(tk.Tk):
                 self.markers.append((c['rgb'], None))
 
     def _draw_markers(self):
-        # draws small markers for each color; if selected color, highlight more
-        # remove previous marker tags
-        self.canvas.delete('marker')
-        # draw each marker
+        # draws small markers for each color; if selected color, highlight more.
+        # Oval items are pooled: existing ones are moved/recolored, extras are only created
+        # when the marker count grows, and unused ones are hidden.
         w = self.canvas.winfo_width() or 400
         h = self.canvas.winfo_height() or 300
         # the image is centered; compute its top-left
         if not self.tk_img:
+            for item in self._marker_ids:
+                self.canvas.itemconfigure(item, state='hidden')
             return
         img_w = self.tk_img.width()
         img_h = self.tk_img.height()
         x0 = (w - img_w)//2
         y0 = (h - img_h)//2
-        for i,(rgb,pos) in enumerate(self.markers):
+        r = 6
+        used = 0
+        for rgb, pos in self.markers:
             if not pos:
                 continue
             x = x0 + pos[0]
             y = y0 + pos[1]
             color = '#%02X%02X%02X' % rgb
-            r = 6
-            self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=color, outline='white', width=1, tags='marker')
+            if used < len(self._marker_ids):
+                item = self._marker_ids[used]
+                self.canvas.coords(item, x-r, y-r, x+r, y+r)
+                self.canvas.itemconfigure(item, fill=color, state='normal')
+            else:
+                item = self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=color, outline='white', width=1, tags='marker')
+                self._marker_ids.append(item)
+            used += 1
+        for item in self._marker_ids[used:]:
+            self.canvas.itemconfigure(item, state='hidden')
         # ensure titlebar stays on top when using overrideredirect
         try:
             self.lift()
         except Exception:
             pass
 
+    PALETTE_TILE_SIZE = 80
+
+    PALETTE_TILE_PAD = 6  # gap around each tile, on every side
+
+    def _create_palette_tile(self, slot: int):
+        """Create the canvas items for palette tile `slot` (hidden until first laid out)."""
+        cp = self.canvas_palette
+        tags = ('tile', f'tile{slot}')
+        rect = cp.create_rectangle(0, 0, 0, 0, outline='', state='hidden', tags=tags + ('tile_block',))
+        # overlay hex label (click to copy) and count in the bottom-right corner
+        hex_txt = cp.create_text(0, 0, anchor='center', state='hidden', tags=tags + ('tile_hex',))
+        cnt_txt = cp.create_text(0, 0, anchor='se', state='hidden', tags=tags)
+        for item in (rect, hex_txt, cnt_txt):
+            self._tile_item_slot[item] = slot
+        return rect, hex_txt, cnt_txt
+
+    def _tile_slot_under_pointer(self):
+        """Palette index of the tile item under the pointer, or None."""
+        cur = self.canvas_palette.find_withtag('current')
+        slot = self._tile_item_slot.get(cur[0]) if cur else None
+        if slot is None or slot >= len(self.palette.colors):
+            return None
+        return slot
+
+    def _on_tile_click(self, event):
+        # toggle enabled on single click
+        slot = self._tile_slot_under_pointer()
+        if slot is not None:
+            self._toggle_enabled(slot)
+
+    def _on_tile_double_click(self, event):
+        # zoom to color on double click
+        slot = self._tile_slot_under_pointer()
+        if slot is not None:
+            self._zoom_to_color(self.palette.colors[slot]['rgb'])
+
+    def _on_tile_hex_click(self, event):
+        slot = self._tile_slot_under_pointer()
+        if slot is not None:
+            self._copy_hex(self.palette.colors[slot]['hex'])
+
+    def _update_tile(self, i: int, cols: int = None):
+        """Sync pooled tile `i` with palette color `i`, touching only what changed since last time."""
+        c = self.palette.colors[i]
+        cp = self.canvas_palette
+        rect, hex_txt, cnt_txt = self._tile_pool[i]
+        prev = self._tile_state[i]
+        # cols=None is a single-tile refresh of a visible tile: keep its grid position
+        pos = prev[1] if cols is None else divmod(i, cols)
+        enabled = c.get('enabled', True)
+        block_color = c['hex'] if enabled else '#888888'
+        look = (block_color, c['hex'], c.get('count', 0))
+        if prev is None or prev[0] != look:
+            fg = c['fg']
+            cp.itemconfigure(rect, fill=block_color)
+            cp.itemconfigure(hex_txt, text=c['hex'], fill=fg)
+            cp.itemconfigure(cnt_txt, text=str(look[2]), fill=fg)
+        if prev is None or prev[1] != pos:
+            tile_w = self.PALETTE_TILE_SIZE
+            pitch = tile_w + 2 * self.PALETTE_TILE_PAD
+            x = pos[1] * pitch + self.PALETTE_TILE_PAD
+            y = pos[0] * pitch + self.PALETTE_TILE_PAD
+            cp.coords(rect, x, y, x + tile_w, y + tile_w)
+            cp.coords(hex_txt, x + tile_w / 2, y + tile_w / 2)
+            cp.coords(cnt_txt, x + tile_w * 0.95, y + tile_w * 0.95)
+        if prev is None:
+            cp.itemconfigure(f'tile{i}', state='normal')
+        self._tile_state[i] = (look, pos)
+
     def _render_palette_list(self):
-        # clear
-        for child in self.scrollable.winfo_children():
-            child.destroy()
+        # Tiles are pooled canvas items: existing ones are reconfigured and moved, new ones are
+        # only created when the palette grows, and surplus tiles are hidden.
+        colors = self.palette.colors
         # Determine tile size and adapt number of columns to available canvas width so
         # the layout stays readable and vertical scrolling is used when necessary.
-        tile_w = 80
-        padding_x = 12  # includes per-tile padx
+        tile_w = self.PALETTE_TILE_SIZE
+        pitch = tile_w + 2 * self.PALETTE_TILE_PAD
         try:
             canvas_w = max(1, self.canvas_palette.winfo_width())
         except Exception:
             canvas_w = 600
         # calculate max columns that can fit without horizontal overflow
-        max_cols = max(1, canvas_w // (tile_w + padding_x))
-        cols = min(max_cols, len(self.palette.colors) or 1)
-        # create compact color tiles with overlayed hex and count labels; keep copy-on-click
-        for i, c in enumerate(self.palette.colors):
-            r = i // cols
-            cc = i % cols
-            frame = ttk.Frame(self.scrollable)
-            frame.grid(row=r, column=cc, padx=6, pady=6, sticky='n')
-            enabled = c.get('enabled', True)
-            block_color = c['hex'] if enabled else '#888888'
-            block = tk.Frame(frame, background=block_color, width=tile_w, height=tile_w, relief='flat')
-            block.grid(row=0, column=0)
-            block.grid_propagate(False)
-            # toggle enabled on single click
-            block.bind('<Button-1>', lambda e, idx=i: self._toggle_enabled(idx))
-            # zoom to color on double click
-            block.bind('<Double-Button-1>', lambda e, rgb=c['rgb']: self._zoom_to_color(rgb))
-            # overlay hex label (click to copy)
-            fg = 'black' if relative_luminance(c['rgb']) > 0.5 else 'white'
-            hex_lbl = tk.Label(block, text=c['hex'], bg=block_color, fg=fg, cursor='hand2')
-            hex_lbl.place(relx=0.5, rely=0.5, anchor='center')
-            hex_lbl.bind('<Button-1>', lambda e, hexv=c['hex']: self._copy_hex(hexv))
-            # overlay count in bottom-right
-            cnt_lbl = tk.Label(block, text=str(c.get('count', 0)), bg=block_color, fg=fg)
-            cnt_lbl.place(relx=0.95, rely=0.95, anchor='se')
+        max_cols = max(1, canvas_w // pitch)
+        cols = min(max_cols, len(colors) or 1)
+        while len(self._tile_pool) < len(colors):
+            self._tile_pool.append(self._create_palette_tile(len(self._tile_pool)))
+            self._tile_state.append(None)
+        # compact color tiles with overlayed hex and count labels; keep copy-on-click
+        for i in range(len(colors)):
+            self._update_tile(i, cols)
+        # hide every surplus tile in one Tcl call via a tag expression ('tile7||tile8||...')
+        surplus = [i for i in range(len(colors), len(self._tile_pool)) if self._tile_state[i] is not None]
+        if surplus:
+            self.canvas_palette.itemconfigure('||'.join(f'tile{i}' for i in surplus), state='hidden')
+            for i in surplus:
+                self._tile_state[i] = None
+        rows = -(-len(colors) // cols)
+        self.canvas_palette.configure(scrollregion=(0, 0, cols * pitch, rows * pitch))
         # keep status updated
-        self.status.config(text=f'Palette: {len(self.palette.colors)} colors')
+        self.status.config(text=f'Palette: {len(colors)} colors')
 
     def _copy_hex(self, hexval: str):
         try:
@@ -1261,7 +1471,11 @@ class ColorExtractor(tk.Tk):
 
     def _toggle_enabled(self, idx):
         self.palette.toggle_enabled(idx)
-        self._render_palette_list()
+        # only this tile's look changes; no need to re-render the whole list
+        if idx < len(self._tile_state) and self._tile_state[idx] is not None:
+            self._update_tile(idx)
+        else:
+            self._render_palette_list()
 
     # Window move/resize helpers
     def _start_move(self, event):
@@ -1579,13 +1793,36 @@ class ColorExtractor(tk.Tk):
         p = filedialog.asksaveasfilename(title='Save colors as text', defaultextension='.txt', filetypes=[('Text','*.txt')])
         if not p:
             return
-        hex_list = self.palette.hex_list(enabled_only=True)
-        lines = '\n'.join(hex_list)
+        # stream enabled colors straight to the file (newline-separated, no trailing newline)
+        # instead of joining the whole list in memory first
+        hexes = (c['hex'] for c in self.palette.colors if c['enabled'])
+        count = 0
         with open(p, 'w', encoding='utf-8') as f:
-            f.write(lines)
-        messagebox.showinfo('Saved', f'Saved {len(hex_list)} colors to {p}')
+            first = next(hexes, None)
+            if first is not None:
+                f.write(first)
+                count = 1
+                for h in hexes:
+                    f.write('\n' + h)
+                    count += 1
+        messagebox.showinfo('Saved', f'Saved {count} colors to {p}')
         _debug_log(f'export_text saved: {p}')
 
+    _EXPORT_FONTS = {}  # (path, size) -> loaded ImageFont, shared by all exports
+
+    @classmethod
+    def _export_font(cls, path: str, size: int):
+        """Load a TrueType font once per (path, size); falls back to PIL's default font."""
+        key = (path, size)
+        font = cls._EXPORT_FONTS.get(key)
+        if font is None:
+            try:
+                font = ImageFont.truetype(path, size)
+            except Exception:
+                font = ImageFont.load_default()
+            cls._EXPORT_FONTS[key] = font
+        return font
+
     def export_image(self):
         if not self.palette.colors:
             messagebox.showinfo('Info', 'No colors to export')
@@ -1593,29 +1830,96 @@ class ColorExtractor(tk.Tk):
         p = filedialog.asksaveasfilename(title='Save colors as image', defaultextension='.png', filetypes=[('PNG','*.png')])
         if not p:
             return
-        # create image: blocks of 100x100 with hex labels
+        # create image: 181x91 swatches in 200x120 cells with hex labels
         cols = 6
-        rows = math.ceil(len(self.palette.colors)/cols)
-        w = cols*200
-        h = rows*120
-        out = Image.new('RGBA',(w,h),(255,255,255,255))
+        n = len(self.palette.colors)
+        rows = math.ceil(n/cols)
+        # paint every swatch in one broadcast assignment over a (rows, 120, cols, 200) cell grid;
+        # cells past the end of the palette stay white
+        grid = np.full((rows * cols, 3), 255, dtype=np.uint8)
+        grid[:n] = self.palette.rgb_array
+        arr = np.full((rows, 120, cols, 200, 4), 255, dtype=np.uint8)
+        arr[:, 10:101, :, 10:191, :3] = grid.reshape(rows, 1, cols, 1, 3)
+        out = Image.fromarray(arr.reshape(rows * 120, cols * 200, 4), mode='RGBA')
         draw = ImageDraw.Draw(out)
-        try:
-            font = ImageFont.truetype('arial.ttf', 18)
-        except Exception:
-            font = ImageFont.load_default()
-        for i,c in enumerate(self.palette.colors):
-            col = c['hex']
-            r = i//cols
-            cc = i%cols
-            x = cc*200 + 10
-            y = r*120 + 10
-            draw.rectangle([x,y,x+180,y+90], fill=col)
-            draw.text((x+6,y+6), c['hex'], fill='black' if relative_luminance(c['rgb']) > 0.5 else 'white', font=font)
+        font = self._export_font('arial.ttf', 18)
+        for i, c in enumerate(self.palette.colors):
+            r, cc = divmod(i, cols)
+            draw.text((cc*200 + 16, r*120 + 16), c['hex'], fill=c['fg'], font=font)
         out.save(p)
         messagebox.showinfo('Saved', f'Palette image saved to {p}')
         _debug_log(f'export_image saved: {p}')
 
+    # --- Settings persistence -------------------------------------------------------
+    @property
+    def max_warn(self):
+        return self._settings['MAX_WARN']
+
+    @max_warn.setter
+    def max_warn(self, value):
+        self._set_setting('MAX_WARN', int(value))
+
+    @property
+    def max_error(self):
+        return self._settings['MAX_ERROR']
+
+    @max_error.setter
+    def max_error(self, value):
+        self._set_setting('MAX_ERROR', int(value))
+
+    def _set_setting(self, key, value):
+        """Update an in-memory setting and schedule a debounced flush to disk."""
+        if self._settings.get(key) == value:
+            return
+        self._settings[key] = value
+        self._settings_dirty = True
+        try:
+            if self._settings_flush_id:
+                self.after_cancel(self._settings_flush_id)
+            self._settings_flush_id = self.after(500, self._flush_settings)
+        except Exception:
+            pass
+
+    def _write_icon_cache(self):
+        """Write the .ico atomically so an interrupted first run can't leave a truncated cache."""
+        import tempfile
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile('wb', dir=ICON_CACHE_PATH.parent, prefix='.colorextractor_', suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                self._icon_pil.save(f, format='ICO', sizes=[(16,16),(32,32)])
+            os.replace(tmp_path, ICON_CACHE_PATH)
+        except Exception:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+            raise
+
+    def _flush_settings(self):
+        """Write the cached settings to SETTINGS_FILE atomically if they changed."""
+        self._settings_flush_id = None
+        if not self._settings_dirty:
+            return
+        tmp_path = None
+        try:
+            import tempfile
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=SETTINGS_FILE.parent, prefix='.colorextractor_', suffix='.tmp', delete=False) as f:
+                tmp_path = f.name
+                json.dump(self._settings, f, indent=2)
+            os.replace(tmp_path, SETTINGS_FILE)
+            self._settings_dirty = False
+            _debug_log('save_settings done')
+        except Exception as e:
+            _debug_log(f'save_settings failed: {e}')
+            # don't leave a half-written temp file behind in the user's home directory
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
     def load_settings(self):
         if not SETTINGS_FILE.exists():
             return
@@ -1625,41 +1929,30 @@ class ColorExtractor(tk.Tk):
         except Exception as e:
             _debug_log(f'load_settings failed: {e}')
             return
-        try:
-            if 'MAX_SAMPLE_DIM' in data:
-                self.palette.MAX_SAMPLE_DIM = int(data['MAX_SAMPLE_DIM'])
-            if 'FULL_SCAN_PIXEL_LIMIT' in data:
-                self.palette.FULL_SCAN_PIXEL_LIMIT = int(data['FULL_SCAN_PIXEL_LIMIT'])
-            if 'UNIQUE_THRESHOLD' in data:
-                self.palette.UNIQUE_THRESHOLD = int(data['UNIQUE_THRESHOLD'])
-            if 'UNIQUE_RATIO_THRESHOLD' in data:
-                self.palette.UNIQUE_RATIO_THRESHOLD = float(data['UNIQUE_RATIO_THRESHOLD'])
-            if 'MAX_QUANT_DIM' in data:
-                self.palette.MAX_QUANT_DIM = int(data['MAX_QUANT_DIM'])
-            if 'MAX_WARN' in data:
-                self.max_warn = int(data['MAX_WARN'])
-            if 'MAX_ERROR' in data:
-                self.max_error = int(data['MAX_ERROR'])
-            _debug_log('load_settings applied')
-        except Exception as e:
-            _debug_log(f'load_settings apply failed: {e}')
+        # coerce each key on its own so one bad value doesn't discard the rest
+        for key, default in DEFAULT_SETTINGS.items():
+            if key in data:
+                try:
+                    self._settings[key] = type(default)(data[key])
+                except Exception as e:
+                    _debug_log(f'load_settings ignored {key}: {e}')
+        for key in ('MAX_SAMPLE_DIM', 'FULL_SCAN_PIXEL_LIMIT', 'UNIQUE_THRESHOLD', 'UNIQUE_RATIO_THRESHOLD', 'MAX_QUANT_DIM'):
+            setattr(self.palette, key, self._settings[key])
+        _debug_log('load_settings applied')
 
     def save_settings(self):
-        data = {
-            'MAX_WARN': int(self.max_warn),
-            'MAX_ERROR': int(self.max_error),
-            'MAX_SAMPLE_DIM': int(getattr(self.palette, 'MAX_SAMPLE_DIM', DEFAULT_SETTINGS['MAX_SAMPLE_DIM'])),
-            'FULL_SCAN_PIXEL_LIMIT': int(getattr(self.palette, 'FULL_SCAN_PIXEL_LIMIT', DEFAULT_SETTINGS['FULL_SCAN_PIXEL_LIMIT'])),
-            'UNIQUE_THRESHOLD': int(getattr(self.palette, 'UNIQUE_THRESHOLD', DEFAULT_SETTINGS['UNIQUE_THRESHOLD'])),
-            'UNIQUE_RATIO_THRESHOLD': float(getattr(self.palette, 'UNIQUE_RATIO_THRESHOLD', DEFAULT_SETTINGS['UNIQUE_RATIO_THRESHOLD'])),
-            'MAX_QUANT_DIM': int(getattr(self.palette, 'MAX_QUANT_DIM', DEFAULT_SETTINGS['MAX_QUANT_DIM'])),
-        }
+        """Sync palette thresholds into the settings cache and flush it immediately."""
+        for key in ('MAX_SAMPLE_DIM', 'FULL_SCAN_PIXEL_LIMIT', 'UNIQUE_THRESHOLD', 'UNIQUE_RATIO_THRESHOLD', 'MAX_QUANT_DIM'):
+            default = DEFAULT_SETTINGS[key]
+            self._set_setting(key, type(default)(getattr(self.palette, key, default)))
         try:
-            with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            _debug_log('save_settings done')
-        except Exception as e:
-            _debug_log(f'save_settings failed: {e}')
+            if self._settings_flush_id:
+                self.after_cancel(self._settings_flush_id)
+        except Exception:
+            pass
+        # explicit saves always hit the disk, even when nothing changed since load
+        self._settings_dirty = True
+        self._flush_settings()
 
 if __name__ == '__main__':
     _debug_log('ColorExtractor: starting')
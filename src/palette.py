@@ -1,29 +1,222 @@
 """Palette utilities: extract and sort palettes from images."""
 from PIL import Image
-import colorsys
 import numpy as np
 from collections import Counter
 
 
+# 256-entry lookup tables indexed by uint8 channel values
+_UNIT_LUT = np.arange(256) / 255  # channel value scaled to [0, 1]
+_HEX_LUT = np.array(['%02X' % i for i in range(256)])  # channel value as two hex digits
+
+
 def rgb_to_hex(rgb):
     return '#{:02X}{:02X}{:02X}'.format(*rgb)
 
 
+def rgb_to_hex_array(rgb):
+    """Vectorized `rgb_to_hex` over an (N, 3) uint8 array; returns a list of '#RRGGBB' strings."""
+    rgb = np.asarray(rgb, dtype=np.uint8).reshape(-1, 3)
+    hexes = np.char.add(np.char.add(np.char.add('#', _HEX_LUT[rgb[:, 0]]), _HEX_LUT[rgb[:, 1]]), _HEX_LUT[rgb[:, 2]])
+    return hexes.tolist()
+
+
 def hex_to_rgb(hexstr):
     hexstr = hexstr.strip().lstrip('#')
     return tuple(int(hexstr[i:i+2], 16) for i in (0,2,4))
 
 
 def relative_luminance(rgb):
+    """Rec. 709 weighted luminance in [0, 1] of an (r, g, b) triple.
+
+    An (..., 3) uint8 ndarray is also accepted and handled in one vectorized LUT gather.
+    """
+    if isinstance(rgb, np.ndarray):
+        f = _UNIT_LUT[rgb]
+        return 0.2126*f[..., 0] + 0.7152*f[..., 1] + 0.0722*f[..., 2]
     r, g, b = [c/255 for c in rgb]
     return 0.2126*r + 0.7152*g + 0.0722*b
 
 
+def text_fg(rgb):
+    """Label color ('black' or 'white') that stays readable on top of `rgb`."""
+    return 'black' if relative_luminance(rgb) > 0.5 else 'white'
+
+
+def rgb_to_hsv_array(rgb):
+    """Vectorized `colorsys.rgb_to_hsv` over an (N, 3) uint8 array; returns (h, s, v) float arrays."""
+    rgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3) / 255
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    rangec = maxc - minc
+    gray = rangec == 0
+    safe_range = np.where(gray, 1.0, rangec)
+    s = np.where(gray, 0.0, rangec / np.where(maxc == 0, 1.0, maxc))
+    rc = (maxc - r) / safe_range
+    gc = (maxc - g) / safe_range
+    bc = (maxc - b) / safe_range
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.where(gray, 0.0, (h / 6.0) % 1.0)
+    return h, s, maxc
+
+
+def pack_rgb(pixels):
+    """Pack (N, 3) uint8 RGB rows into (N,) uint32 keys `r<<16 | g<<8 | b`.
+
+    Packed keys sort in the same order as the RGB rows, so a 1-D unique/sort over them
+    replaces the much slower row-wise `np.unique(..., axis=0)`.
+    """
+    pixels = np.asarray(pixels, dtype=np.uint8).reshape(-1, 3)
+    # build the keys in place in a single uint32 buffer: no per-channel upcast temporaries
+    keys = pixels[:, 0].astype(np.uint32)
+    keys <<= 8
+    keys |= pixels[:, 1]
+    keys <<= 8
+    keys |= pixels[:, 2]
+    return keys
+
+
+def unpack_rgb(keys):
+    """Inverse of `pack_rgb`: (N,) packed keys back to an (N, 3) uint8 array."""
+    keys = np.asarray(keys, dtype=np.uint32)
+    return np.stack(((keys >> 16) & 0xFF, (keys >> 8) & 0xFF, keys & 0xFF), axis=1).astype(np.uint8)
+
+
+# Pixel count from which `count_colors` switches from a sort-based unique to a dense 2**24-bucket
+# histogram. The histogram's fixed cost (allocating and sweeping 16.7M buckets) only pays off once
+# N is at least that large; below it NumPy's sort-based unique measured faster.
+HISTOGRAM_MIN_PIXELS = 1 << 24
+
+
+def count_colors(pixels):
+    """Count unique RGB colors in an (N, 3) uint8 array.
+
+    Returns (vals, counts) ordered by descending count, ties broken by RGB value.
+    """
+    packed = pack_rgb(pixels)
+    if len(packed) >= HISTOGRAM_MIN_PIXELS:
+        # O(N) histogram over every 24-bit color; nonzero buckets come out in key order
+        hist = np.bincount(packed, minlength=1 << 24)
+        keys = np.flatnonzero(hist).astype(np.uint32)
+        counts = hist[keys]
+    else:
+        keys, counts = np.unique(packed, return_counts=True)
+    order = np.argsort(-counts, kind='stable')
+    return unpack_rgb(keys[order]), counts[order]
+
+
+def unique_color_count(pixels):
+    """Number of distinct RGB colors in an (N, 3) uint8 array (keys are never unpacked)."""
+    return len(np.unique(pack_rgb(pixels)))
+
+
+def stride_step(size, max_dim):
+    """Uniform stride that brings the longest edge of `size` (any 2 dims) down to `max_dim`."""
+    return max(1, -(-max(size) // max(1, max_dim)))  # ceil division
+
+
+def stride_sample_image(img, max_dim):
+    """Subsample a PIL image with a uniform stride so its longest edge fits `max_dim`.
+
+    Only existing pixels are picked (no interpolation), so the sample keeps the source color
+    histogram instead of inventing blended colors the way a LANCZOS resize does. A nearest-neighbour
+    affine transform reads source pixel (x * step, y * step) for each output pixel, so the result
+    equals `np.asarray(img)[::step, ::step]` while only the sample is ever materialized.
+    """
+    w, h = img.size
+    step = stride_step(img.size, max_dim)
+    if step <= 1:
+        return img
+    # sample positions are (x + 0.5) * step + c; c shifts them onto x * step + 0.5
+    c = 0.5 - step / 2
+    size = (-(-w // step), -(-h // step))
+    return img.transform(size, Image.AFFINE, (step, 0, c, 0, step, c), resample=Image.NEAREST)
+
+
+def working_image(img):
+    """`img` as RGB, or as RGBA when it can carry transparency (no copy if already in that mode)."""
+    mode = 'RGBA' if ('A' in img.getbands() or 'transparency' in img.info) else 'RGB'
+    return img if img.mode == mode else img.convert(mode)
+
+
+def opaque_rgb(arr):
+    """(N, 3) RGB rows of the non-transparent pixels of a `working_image` array (or a sample of one)."""
+    if arr.shape[2] == 3:
+        return arr.reshape(-1, 3)
+    return arr[:, :, :3][arr[:, :, 3] > 0]
+
+
+def palette_distance_terms(palette):
+    """Palette-side invariants for `nearest_palette_indices`, computed once per palette.
+
+    Returns (-2 * palette.T as a (3, k) float32 matrix, |c|^2 per palette color).
+    """
+    pal = np.asarray(palette, dtype=np.float32).reshape(-1, 3)
+    return np.ascontiguousarray(-2 * pal.T), np.einsum('ij,ij->i', pal, pal)
+
+
+def nearest_palette_indices(pixels, palette, terms=None):
+    """Return, for each RGB pixel, the index of the nearest palette color (squared L2).
+
+    `pixels` is (N, 3) and `palette` is (k, 3), both uint8-valued. Distances are expanded as
+    |p|^2 + |c|^2 - 2 p.c; |p|^2 is constant per pixel and dropped, so the heavy part is a single
+    (N, 3) x (3, k) float32 GEMM. All terms stay below 2**24, so float32 keeps them exact.
+    Pass `terms` from `palette_distance_terms` to reuse the palette invariants across calls.
+    """
+    pal_t, pal_sq = terms if terms is not None else palette_distance_terms(palette)
+    pix = np.asarray(pixels, dtype=np.float32).reshape(-1, 3)
+    dists = pix @ pal_t
+    dists += pal_sq
+    return dists.argmin(axis=1)
+
+
+DISTANCE_TILE_BYTES = 1 << 20  # scratch budget for one (block, k) float32 distance tile (~L2 sized)
+
+
+def first_pixel_per_color(pixels, palette, block: int = None):
+    """For each palette color, the index of the first pixel whose nearest color it is (-1 if none).
+
+    Pixels are scanned in blocks with an O(k) first-hit table, and scanning stops as soon as
+    every color has been hit. By default the block is sized so each (block, k) distance tile fits
+    in DISTANCE_TILE_BYTES, keeping the GEMM output cache-resident even for large palettes.
+    (A k-d tree over the palette would not pay off: k is at most a few hundred points in 3-D, the
+    blocked GEMM already runs in BLAS, and a tree query could not stop early like the scan does.)
+    """
+    pixels = np.asarray(pixels).reshape(-1, 3)
+    k = len(palette)
+    if block is None:
+        block = max(1024, DISTANCE_TILE_BYTES // (4 * max(1, k)))
+    first = np.full(k, -1, dtype=np.int64)
+    missing = k
+    terms = palette_distance_terms(palette)
+    for start in range(0, len(pixels), block):
+        nearest = nearest_palette_indices(pixels[start:start + block], palette, terms)
+        hit, idx = np.unique(nearest, return_index=True)
+        new = first[hit] < 0
+        first[hit[new]] = idx[new] + start
+        missing -= int(new.sum())
+        if not missing:
+            break
+    return first
+
+
 class Palette:
-    """Represents a palette: list of dicts with keys: rgb, hex, count, enabled"""
+    """Represents a palette: list of dicts with keys: rgb, hex, count, enabled, fg"""
 
     def __init__(self):
-        self.colors = []  # list of {'rgb':(r,g,b), 'hex':str, 'count':int, 'enabled':bool}
+        self.colors = []  # list of {'rgb':(r,g,b), 'hex':str, 'count':int, 'enabled':bool, 'fg':str}
+        self._rgb = None  # cached (N, 3) uint8 mirror of the colors' rgb values, in list order
+        # sort keys by mode, in list order; valid while `_keys_rgb` is the current `_rgb`
+        self._keys = {}
+        self._keys_rgb = None
+        self._stage = None  # (img, max_sample_dim, stage dict) of the last `_sample_stage` call
+
+    @property
+    def rgb_array(self):
+        """(N, 3) uint8 array of the palette colors in list order (cached until the palette changes)."""
+        if self._rgb is None or len(self._rgb) != len(self.colors):
+            self._rgb = np.array([c['rgb'] for c in self.colors], dtype=np.uint8).reshape(-1, 3)
+        return self._rgb
 
     MAX_QUANT_DIM = 800  # max dimension (width or height) used when quantizing for performance
 
@@ -32,44 +225,30 @@ class Palette:
 
         Improvements:
         - Ignores fully transparent pixels when building the quantization sample.
-        - Resizes large images to `max_dim` on the longest edge to keep quantization fast.
+        - Subsamples large images (uniform pixel stride, no resampling filter) to `max_dim` on the
+          longest edge to keep quantization fast.
         """
         if n <= 0:
             self.colors = []
             return
-        # ensure RGBA working copy
-        working = img.convert('RGBA')
-        w, h = working.size
-        # optionally resize to keep quantization fast
-        if max(w, h) > max_dim:
-            scale = max_dim / max(w, h)
-            new_size = (max(1, int(w * scale)), max(1, int(h * scale)))
-            sample = working.resize(new_size, Image.LANCZOS)
-        else:
-            sample = working
-        arr = np.array(sample)
-        alpha = arr[:, :, 3]
-        mask = alpha > 0
-        # collect only non-transparent pixels
-        rgb_pixels = arr[:, :, :3][mask]
-        if rgb_pixels.size == 0:
+        # stride-subsampled working copy to keep quantization fast; only the sample is materialized
+        tmp = stride_sample_image(working_image(img), max_dim)
+        if tmp.mode == 'RGBA':
+            # collect the non-transparent pixels into a 1-pixel tall image so quantization ignores
+            # transparency. The quantizer flattens its input, so the row shape costs nothing, and
+            # unlike a padded square tile it adds no duplicate pixels that would skew the median cut.
+            rgb_pixels = opaque_rgb(np.asarray(tmp))
+            tmp = Image.frombytes('RGB', (len(rgb_pixels), 1), rgb_pixels.tobytes())
+        if tmp.width * tmp.height == 0:
             self.colors = []
             return
-        # create a 1-pixel tall image of non-transparent pixels so quantization ignores transparency
-        rgb_pixels = np.asarray(rgb_pixels, dtype=np.uint8).reshape(-1, 3)
-        tmp = Image.fromarray(rgb_pixels.reshape(1, len(rgb_pixels), 3), mode='RGB')
-        q = tmp.convert('P', palette=Image.ADAPTIVE, colors=n)
-        palette = q.getpalette() or []  # flat R,G,B list
-        counts = q.getcolors(maxcolors=65536) or []
-        mapping = []
-        for count, idx in counts:
-            r = palette[idx*3]
-            g = palette[idx*3+1]
-            b = palette[idx*3+2]
-            mapping.append({'rgb':(r, g, b), 'hex':rgb_to_hex((r, g, b)), 'count':int(count), 'enabled':True})
-        # sort by count desc
-        mapping.sort(key=lambda x: x['count'], reverse=True)
-        self.colors = mapping
+        q = tmp.quantize(colors=n, method=Image.Quantize.MEDIANCUT)
+        palette = np.array(q.getpalette() or [], dtype=np.uint8).reshape(-1, 3)
+        used = np.array(q.getcolors(maxcolors=65536) or [], dtype=np.int64).reshape(-1, 2)  # (count, index)
+        counts = used[:, 0]
+        # sort by count desc (stable, like the list sort it replaces); hex/fg are built in bulk
+        order = np.argsort(-counts, kind='stable')
+        self.set_counted_colors(palette[used[order, 1]], counts[order])
 
     # heuristics for 'max' mode
     MAX_SAMPLE_DIM = 1200
@@ -77,6 +256,42 @@ class Palette:
     UNIQUE_THRESHOLD = 2048
     UNIQUE_RATIO_THRESHOLD = 0.05
 
+    def _sample_stage(self, img: Image.Image, max_sample_dim: int):
+        """Shared first stage of the 'max' helpers for `img`.
+
+        Returns a dict with the `working_image` ('img'), its opaque pixel count ('total') and the
+        (N, 3) opaque pixels of its stride sample ('sample'); 'unique' (the sample's distinct color
+        count) is filled in on first use. The last stage is kept, so the early rejection, the estimate
+        and the count for one image share a single conversion and sample.
+        Only the sample and (for images with alpha) the alpha channel are turned into arrays; the
+        full pixel array is left to the full-scan path that actually needs it.
+        """
+        cached = self._stage
+        if cached is not None and cached[0] is img and cached[1] == max_sample_dim:
+            return cached[2]
+        work = working_image(img)
+        if work.mode == 'RGB':
+            total = work.width * work.height
+        else:
+            total = int(np.count_nonzero(np.asarray(work.getchannel('A'))))
+        stage = {
+            'img': work,
+            'total': total,
+            'sample': opaque_rgb(np.asarray(stride_sample_image(work, max_sample_dim))).reshape(-1, 3),
+        }
+        self._stage = (img, max_sample_dim, stage)
+        return stage
+
+    @staticmethod
+    def _stage_unique(stage):
+        if 'unique' not in stage:
+            stage['unique'] = unique_color_count(stage['sample'])
+        return stage['unique']
+
+    def release_sample(self):
+        """Drop the cached sample stage (and with it the reference to its image)."""
+        self._stage = None
+
     def estimate_unique_stats(self, img: Image.Image, max_sample_dim: int = None):
         """Estimate unique color statistics from a sampled image.
 
@@ -84,37 +299,49 @@ class Palette:
         """
         if max_sample_dim is None:
             max_sample_dim = self.MAX_SAMPLE_DIM
-        im = img.convert('RGBA')
-        w, h = im.size
-        arr_full = np.array(im)
-        alpha = arr_full[:, :, 3]
-        mask = alpha > 0
-        total_pixels = int(mask.sum())
+        stage = self._sample_stage(img, max_sample_dim)
+        total_pixels = stage['total']
         if total_pixels == 0:
             return 0, 0, 0
-        # sample if large
-        if max(w, h) > max_sample_dim:
-            scale = max_sample_dim / max(w, h)
-            sample_size = (max(1, int(w * scale)), max(1, int(h * scale)))
-            sample = im.resize(sample_size, Image.LANCZOS)
-            arr_sample = np.array(sample)
-            mask_s = arr_sample[:, :, 3] > 0
-            rgb_sample = arr_sample[:, :, :3][mask_s]
-        else:
-            rgb_sample = arr_full[:, :, :3][mask]
-        if rgb_sample.size == 0:
+        if len(stage['sample']) == 0:
             return 0, 0, total_pixels
-        sample_pixels = rgb_sample.reshape(-1, 3)
-        vals_sample = np.unique(sample_pixels, axis=0)
-        return int(len(vals_sample)), int(len(sample_pixels)), int(total_pixels)
+        return self._stage_unique(stage), len(stage['sample']), total_pixels
+
+    def sample_exceeds_unique(self, img: Image.Image, limit: int, max_sample_dim: int = None):
+        """Return True when a stride sample of `img` alone has more than `limit` distinct opaque colors.
+
+        Pillow's `getcolors` stops counting as soon as `limit` is passed, so very colorful images
+        are rejected without a full unique count. False says nothing about the full image.
+        """
+        if max_sample_dim is None:
+            max_sample_dim = self.MAX_SAMPLE_DIM
+        rgb = np.ascontiguousarray(self._sample_stage(img, max_sample_dim)['sample'])
+        sample = Image.fromarray(rgb.reshape(1, -1, 3), mode='RGB')
+        return sample.getcolors(maxcolors=max(1, limit)) is None
 
-    def from_image_max(self, img: Image.Image, *, force_full_scan: bool = False, max_sample_dim: int = None, full_scan_pixel_limit: int = None, unique_threshold: int = None, unique_ratio_threshold: float = None, max_unique_error: int = None):
+    def from_image_max(self, img: Image.Image, **kwargs):
         """Return every unique color in the image (ignores fully transparent pixels).
 
+        Accepts the same keyword arguments as `count_image_max`, which does the actual work.
+        If `max_unique_error` is provided and the exact full-resolution unique set exceeds it, a
+        ValueError will be raised to prevent creating a huge palette.
+        """
+        vals, counts = self.count_image_max(img, **kwargs)
+        self.set_counted_colors(vals, counts)
+
+    def count_image_max(self, img: Image.Image, *, force_full_scan: bool = False, max_sample_dim: int = None, full_scan_pixel_limit: int = None, unique_threshold: int = None, unique_ratio_threshold: float = None, max_unique_error: int = None, stats_out: dict = None):
+        """Count the colors `from_image_max` would load, without touching the palette.
+
+        Returns (vals, counts) as from `count_colors` (empty when nothing is opaque). Only reads the
+        threshold attributes, so it is safe to run on a worker thread while the UI keeps using
+        the current colors; apply the result with `set_counted_colors` on the UI thread.
+
         Parameters can override internal thresholds. If `force_full_scan` is True we'll attempt an exact
         full-resolution unique/color count even if the sample heuristics would normally avoid it.
         If `max_unique_error` is provided and the exact full-resolution unique set exceeds it, a
-        ValueError will be raised to prevent creating a huge palette.
+        ValueError will be raised.
+        If `stats_out` is a dict it receives 'sample_unique', 'sample_pixels', 'total_pixels' and
+        'full_scan' as they are determined.
         """
         # resolve thresholds
         if max_sample_dim is None:
@@ -125,34 +352,25 @@ class Palette:
             unique_threshold = self.UNIQUE_THRESHOLD
         if unique_ratio_threshold is None:
             unique_ratio_threshold = self.UNIQUE_RATIO_THRESHOLD
+        empty = (np.empty((0, 3), dtype=np.uint8), np.empty(0, dtype=np.int64))
 
-        im = img.convert('RGBA')
-        w, h = im.size
-        arr_full = np.array(im)
-        # mask non-transparent
-        alpha = arr_full[:, :, 3]
-        mask = alpha > 0
-        total_pixels = int(mask.sum())
+        if stats_out is None:
+            stats_out = {}
+        # sampled image for estimation (shared with estimate_unique_stats for the same image)
+        stage = self._sample_stage(img, max_sample_dim)
+        # this is the stage's last consumer: let go of the cached copy so the working image
+        # (an RGBA conversion for images with alpha) is freed as soon as counting finishes
+        self.release_sample()
+        work = stage['img']
+        total_pixels = stats_out['total_pixels'] = stage['total']
         if total_pixels == 0:
-            self.colors = []
-            return
-        # If image is very large, build a sampled image for estimation
-        if max(w, h) > max_sample_dim:
-            scale = max_sample_dim / max(w, h)
-            sample_size = (max(1, int(w * scale)), max(1, int(h * scale)))
-            sample = im.resize(sample_size, Image.LANCZOS)
-            arr_sample = np.array(sample)
-            mask_s = arr_sample[:, :, 3] > 0
-            rgb_sample = arr_sample[:, :, :3][mask_s]
-        else:
-            rgb_sample = arr_full[:, :, :3][mask]
-        if rgb_sample.size == 0:
-            self.colors = []
-            return
+            return empty
+        sample_pixels = stage['sample']
+        stats_out['sample_pixels'] = len(sample_pixels)
+        if len(sample_pixels) == 0:
+            return empty
         # sample statistics
-        sample_pixels = rgb_sample.reshape(-1, 3)
-        vals_sample = np.unique(sample_pixels, axis=0)
-        sample_unique_count = len(vals_sample)
+        sample_unique_count = stats_out['sample_unique'] = self._stage_unique(stage)
         sample_unique_ratio = sample_unique_count / len(sample_pixels)
         # Decide whether to attempt a full-resolution unique count
         do_full_scan = False
@@ -160,57 +378,68 @@ class Palette:
             do_full_scan = True
         elif (sample_unique_count <= unique_threshold or sample_unique_ratio <= unique_ratio_threshold) and total_pixels <= full_scan_pixel_limit:
             do_full_scan = True
+        stats_out['full_scan'] = do_full_scan
         if do_full_scan:
-            # compute exact unique colors/counts from the full-resolution pixels
-            pixels = arr_full[:, :, :3][mask].reshape(-1, 3)
-            vals, counts = np.unique(pixels, axis=0, return_counts=True)
+            # compute exact unique colors/counts from the full-resolution pixels; the sample is no
+            # longer needed, so drop it before the full-size temporaries are allocated
+            del stage, sample_pixels
+            vals, counts = count_colors(opaque_rgb(np.asarray(work)))
             if max_unique_error is not None and len(vals) > max_unique_error:
                 raise ValueError('There are too many colors to display!')
-            mapping = []
-            for v, c in zip(vals, counts):
-                rgb = tuple(int(x) for x in v)
-                mapping.append({'rgb': rgb, 'hex': rgb_to_hex(rgb), 'count': int(c), 'enabled': True})
-            mapping.sort(key=lambda x: x['count'], reverse=True)
-            self.colors = mapping
-            return
+            return vals, counts
         # Fallback: compute unique on the sampled image only (fast approximate)
-        pixels = sample_pixels
-        vals, counts = np.unique(pixels, axis=0, return_counts=True)
+        return count_colors(sample_pixels)
+
+    def set_counted_colors(self, vals, counts, enabled=None):
+        """Replace the palette with `count_colors` output (kept in the given order).
+
+        `enabled` optionally gives a per-color bool array; all colors are enabled by default.
+        """
+        fgs = np.where(relative_luminance(vals) > 0.5, 'black', 'white').tolist()
+        flags = [True] * len(fgs) if enabled is None else np.asarray(enabled, dtype=bool).tolist()
         mapping = []
-        for v, c in zip(vals, counts):
-            rgb = tuple(int(x) for x in v)
-            mapping.append({'rgb': rgb, 'hex': rgb_to_hex(rgb), 'count': int(c), 'enabled': True})
-        mapping.sort(key=lambda x: x['count'], reverse=True)
+        for rgb, hexc, c, fg, on in zip(vals.tolist(), rgb_to_hex_array(vals), counts.tolist(), fgs, flags):
+            mapping.append({'rgb': tuple(rgb), 'hex': hexc, 'count': c, 'enabled': on, 'fg': fg})
         self.colors = mapping
+        self._rgb = np.ascontiguousarray(vals, dtype=np.uint8)
 
-    def sort(self, mode='frequency', disabled_to_top=False):
-        def hsv(rgb):
-            r,g,b = [x/255 for x in rgb]
-            return colorsys.rgb_to_hsv(r,g,b)
+    def _sort_key(self, mode):
+        """Sort key array for `mode` in list order, computed once and kept until the colors change."""
+        rgb = self.rgb_array
+        if self._keys_rgb is not rgb:
+            self._keys, self._keys_rgb = {}, rgb
+        key = self._keys.get(mode)
+        if key is not None:
+            return key
         if mode == 'frequency':
-            key = lambda c: (-c['count'],)
-        elif mode == 'hue':
-            key = lambda c: (hsv(c['rgb'])[0],)
-        elif mode == 'saturation':
-            key = lambda c: (hsv(c['rgb'])[1],)
-        elif mode == 'value':
-            key = lambda c: (hsv(c['rgb'])[2],)
+            key = -np.fromiter((c['count'] for c in self.colors), dtype=np.int64, count=len(self.colors))
+        elif mode in ('hue', 'saturation', 'value'):
+            # one pass yields all three HSV keys
+            self._keys['hue'], self._keys['saturation'], self._keys['value'] = rgb_to_hsv_array(rgb)
+            return self._keys[mode]
         elif mode == 'luminance':
-            key = lambda c: (relative_luminance(c['rgb']),)
+            key = relative_luminance(rgb)
         elif mode == 'hex':
-            key = lambda c: (c['hex'],)
+            # fixed-width uppercase hex orders the same as the packed 24-bit value
+            key = pack_rgb(rgb)
         else:
-            key = lambda c: (0,)
-        # stable sort: we'll separate enabled/disabled if needed
+            key = np.zeros(len(self.colors))
+        self._keys[mode] = key
+        return key
+
+    def sort(self, mode='frequency', disabled_to_top=False):
+        rgb = self.rgb_array
+        key = self._sort_key(mode)
         if disabled_to_top:
-            # disabled first, then sort each partition
-            disabled = [c for c in self.colors if not c.get('enabled', True)]
-            enabled = [c for c in self.colors if c.get('enabled', True)]
-            disabled.sort(key=key)
-            enabled.sort(key=key)
-            self.colors = disabled + enabled
+            # one stable lexsort: disabled first (primary key), each group ordered by `key`
+            enabled = np.fromiter((c.get('enabled', True) for c in self.colors), dtype=bool, count=len(self.colors))
+            order = np.lexsort((key, enabled))
         else:
-            self.colors.sort(key=key)
+            order = np.argsort(key, kind='stable')
+        self.colors = [self.colors[i] for i in order]
+        # carry the cached keys along with the new order
+        self._rgb = self._keys_rgb = rgb[order]
+        self._keys = {m: k[order] for m, k in self._keys.items()}
 
     def toggle_enabled(self, index: int):
         if 0 <= index < len(self.colors):
@@ -218,12 +447,35 @@ class Palette:
 
     def add_color(self, rgb):
         hexc = rgb_to_hex(rgb)
-        self.colors.append({'rgb':rgb, 'hex':hexc, 'count':0, 'enabled':True})
+        self.colors.append({'rgb':rgb, 'hex':hexc, 'count':0, 'enabled':True, 'fg':text_fg(rgb)})
+        self._rgb = None
 
     def remove_color(self, index):
         if 0 <= index < len(self.colors):
             self.colors.pop(index)
+            self._rgb = None
 
     def hex_list(self, enabled_only=True):
         vals = [c['hex'] for c in self.colors if (c['enabled'] or not enabled_only)]
         return vals
+
+    def save_palette(self, path):
+        """Save the palette to a compressed .npz file (rgb, count and enabled arrays, in list order).
+
+        NumPy appends '.npz' to `path` if it has no extension.
+        """
+        n = len(self.colors)
+        np.savez_compressed(
+            path,
+            rgb=self.rgb_array,
+            count=np.fromiter((c['count'] for c in self.colors), dtype=np.uint32, count=n),
+            enabled=np.fromiter((c['enabled'] for c in self.colors), dtype=np.bool_, count=n),
+        )
+
+    def load_palette(self, path):
+        """Replace the palette with one written by `save_palette`."""
+        with np.load(path) as data:
+            rgb = data['rgb'].astype(np.uint8).reshape(-1, 3)
+            counts = data['count'].astype(np.int64)
+            enabled = data['enabled']
+        self.set_counted_colors(rgb, counts, enabled)